@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Load test for guess_game_server.py.
+
+Starts the server on localhost (or targets one already running), then runs
+N simulated players. Each player keeps one HTTP/1.1 connection open and
+plays games back to back: /newgame, then a binary search over /guess until
+it hits the number. Results are printed as JSON so runs can be diffed.
+
+    python3 bench_guess_server.py --players 200 --duration 10 --mode asyncio
+    python3 bench_guess_server.py --output before.json
+    python3 bench_guess_server.py --compare before.json
+    python3 bench_guess_server.py --router
+    python3 bench_guess_server.py --check-restart
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from urllib.parse import urlparse, parse_qs
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'guess_game_server.py')
+GUESS_MAX = 100
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'server did not start listening on port {port}')
+
+
+def start_server(port, mode, server_args, workdir):
+    cmd = [sys.executable, SERVER_SCRIPT, '--port', str(port), '--mode', mode,
+           '--leaderboard', os.path.join(workdir, 'leaderboard.log'),
+           # keep the run isolated from (and from overwriting) a real server's snapshot
+           '--snapshot', os.path.join(workdir, 'sessions.snap'),
+           # every simulated player shares 127.0.0.1, so the per-client limit would throttle the run
+           '--rate', '0'] + server_args
+    proc = subprocess.Popen(cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+    except RuntimeError:
+        proc.kill()
+        raise
+    return proc
+
+
+class Player:
+    """One keep-alive connection playing games until the deadline."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.cookie = None
+        self.latencies = []
+        self.errors = 0
+        self.games = 0
+
+    async def request(self, reader, writer, path):
+        headers = f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+        if self.cookie:
+            headers += f'Cookie: {self.cookie}\r\n'
+        started = time.perf_counter()
+        writer.write((headers + '\r\n').encode('latin-1'))
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('server closed the connection')
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'set-cookie':
+                self.cookie = value.strip().split(';')[0]
+        body = await reader.readexactly(length) if length else b''
+        self.latencies.append(time.perf_counter() - started)
+        if status != 200:
+            self.errors += 1
+        return body
+
+    async def play_game(self, reader, writer):
+        await self.request(reader, writer, '/newgame')
+        low, high = 1, GUESS_MAX
+        while low <= high:
+            guess = (low + high) // 2
+            result = json.loads(await self.request(reader, writer, f'/guess?number={guess}'))['result']
+            if result == 'correct':
+                self.games += 1
+                return
+            elif result == 'too_low':
+                low = guess + 1
+            else:
+                high = guess - 1
+
+    async def play(self, deadline):
+        while time.monotonic() < deadline:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                self.errors += 1
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                while time.monotonic() < deadline:
+                    await self.play_game(reader, writer)
+            except (OSError, ValueError, KeyError, asyncio.IncompleteReadError):
+                self.errors += 1
+            finally:
+                writer.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_players(host, port, players, duration):
+    deadline = time.monotonic() + duration
+    crowd = [Player(host, port) for _ in range(players)]
+    started = time.perf_counter()
+    await asyncio.gather(*(player.play(deadline) for player in crowd))
+    return crowd, time.perf_counter() - started
+
+
+def summarize(crowd, elapsed, config):
+    latencies = sorted(latency for player in crowd for latency in player.latencies)
+    requests = len(latencies)
+    return {
+        'config': config,
+        'elapsed_sec': round(elapsed, 3),
+        'requests': requests,
+        'games': sum(player.games for player in crowd),
+        'errors': sum(player.errors for player in crowd),
+        'throughput_rps': round(requests / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / requests * 1000, 3) if requests else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+
+def compare(report, baseline):
+    """Return new/old ratios for the headline numbers."""
+    ratios = {'throughput_rps': None}
+    if baseline['throughput_rps']:
+        ratios['throughput_rps'] = round(report['throughput_rps'] / baseline['throughput_rps'], 3)
+    for key in ('p50', 'p95', 'p99'):
+        old = baseline['latency_ms'][key]
+        ratios[f'latency_{key}'] = round(report['latency_ms'][key] / old, 3) if old else None
+    return ratios
+
+
+ROUTER_SAMPLE = ('/guess?number=50', '/guess?number=75', '/guess?number=62', '/newgame', '/',
+                 '/leaderboard?top=10', '/stats', '/guess?number=68')
+
+
+def legacy_route(path):
+    """The if/elif dispatch and urlparse + parse_qs query handling the
+    route table replaced, kept here as the baseline."""
+    if path == '/':
+        return 'index'
+    elif path.startswith('/guess'):
+        params = parse_qs(urlparse(path).query)
+        return 'guess', int(params.get('number', [0])[0])
+    elif path == '/newgame':
+        return 'newgame'
+    elif path == '/leaderboard' or path.startswith('/leaderboard?'):
+        params = parse_qs(urlparse(path).query)
+        return 'leaderboard', int(params.get('top', [10])[0])
+    elif path == '/metrics':
+        return 'metrics'
+    elif path == '/stats':
+        return 'stats'
+    return None
+
+
+def make_table_route(server):
+    def table_route(path):
+        path, _, query = path.partition('?')
+        handler = server.ROUTES.get(('GET', path))
+        if handler is server.route_guess:
+            return handler, server.query_int(query, 'number')
+        elif handler is server.route_leaderboard:
+            return handler, server.query_int(query, 'top')
+        return handler
+    return table_route
+
+
+def bench_router(rounds=20000):
+    """Per-request routing and query parsing cost, old path vs route table."""
+    sys.path.insert(0, os.path.dirname(SERVER_SCRIPT))
+    import guess_game_server
+    results = {}
+    for name, route in (('legacy', legacy_route), ('route_table', make_table_route(guess_game_server))):
+        seconds = min(timeit.repeat(lambda: [route(path) for path in ROUTER_SAMPLE], number=rounds, repeat=5))
+        results[f'{name}_ns_per_request'] = round(seconds / (rounds * len(ROUTER_SAMPLE)) * 1e9, 1)
+    results['speedup'] = round(results['legacy_ns_per_request'] / results['route_table_ns_per_request'], 2)
+    return results
+
+
+async def win_games(host, port, count):
+    """Finish ``count`` games, each as a new player."""
+    for _ in range(count):
+        player = Player(host, port)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await player.play_game(reader, writer)
+        finally:
+            writer.close()
+
+
+def server_stats(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+    try:
+        conn.request('GET', '/stats')
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def wait_for_ranked(port, ranked, timeout=5.0):
+    """Poll /stats until the leaderboard holds ``ranked`` games; returns the last stats seen."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            stats = server_stats(port)
+        except OSError:
+            stats = None
+        if stats is not None and stats['leaderboard']['ranked'] >= ranked or time.monotonic() > deadline:
+            return stats
+        time.sleep(0.05)
+
+
+def child_pids(pid):
+    """Direct children of ``pid``, read from /proc (Linux, like --workers itself)."""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        if int(stat.rpartition(')')[2].split()[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def check_restart(workers=2, server_args=()):
+    """SIGKILL every pre-fork child (housekeeper and workers) and check
+    that wins still reach the leaderboard and its log once they restart."""
+    with tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        proc = start_server(port, 'threaded', ['--workers', str(workers)] + list(server_args), workdir)
+        try:
+            asyncio.run(win_games('127.0.0.1', port, 1))
+            before = wait_for_ranked(port, 1)
+            killed = child_pids(proc.pid)
+            for pid in killed:
+                os.kill(pid, signal.SIGKILL)
+            deadline = time.monotonic() + 10
+            while len(set(child_pids(proc.pid)) - set(killed)) < workers + 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            wait_for_port(port)
+            asyncio.run(win_games('127.0.0.1', port, 2))
+            after = wait_for_ranked(port, 3)
+        finally:
+            proc.terminate()
+            proc.wait()
+        with open(os.path.join(workdir, 'leaderboard.log'), 'rb') as f:
+            logged = f.read().count(b'\n')
+    return {
+        'killed': len(killed),
+        'ranked_before': before['leaderboard']['ranked'],
+        'ranked_after': after['leaderboard']['ranked'],
+        'log_records': logged,
+        'ok': after['leaderboard']['ranked'] == 3 and logged == 3
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test for the Guess the Number server')
+    parser.add_argument('--players', type=int, default=100, help='concurrent simulated players')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run')
+    parser.add_argument('--mode', choices=('threaded', 'asyncio'), default='threaded')
+    parser.add_argument('--target', metavar='HOST:PORT',
+                        help='benchmark a server that is already running instead of starting one')
+    parser.add_argument('--server-arg', action='append', default=[], dest='server_args',
+                        help='extra argument passed to guess_game_server.py (repeatable)')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON report from an earlier run to compare against')
+    parser.add_argument('--router', action='store_true',
+                        help='only micro-benchmark request routing and query parsing, in process')
+    parser.add_argument('--check-restart', action='store_true',
+                        help='check that wins survive SIGKILLed --workers children, instead of load testing')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.router:
+        print(json.dumps(bench_router(), indent=2))
+        return
+    if args.check_restart:
+        result = check_restart(server_args=args.server_args)
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result['ok'] else 1)
+    config = {'players': args.players, 'duration_sec': args.duration, 'mode': args.mode,
+              'server_args': args.server_args, 'target': args.target}
+    proc = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.target:
+            host, _, port = args.target.rpartition(':')
+            port = int(port)
+        else:
+            host, port = '127.0.0.1', free_port()
+            proc = start_server(port, args.mode, args.server_args, workdir)
+        try:
+            crowd, elapsed = asyncio.run(run_players(host, port, args.players, args.duration))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+
+    report = summarize(crowd, elapsed, config)
+    if args.compare:
+        with open(args.compare) as f:
+            report['compared_to'] = {'baseline': args.compare, 'ratios': compare(report, json.load(f))}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
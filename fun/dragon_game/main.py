@@ -8,13 +8,22 @@ collect gold and hearts, and survive as long as you can.
 No external assets; everything is drawn with pygame primitives.
 """
 
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
 import math
 import os
 import random
+import struct
 import sys
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
+# Keep pygame's import banner off stdout, where --headless writes its JSON report
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
 
 
@@ -52,8 +61,38 @@ PICKUP_GOLD_VALUE = (5, 20)
 PICKUP_HEART_HEAL = (10, 25)
 LOOT_DROP_CHANCE = 0.35
 
+DRAGON_TOUCH_RADIUS = 28
+FIRE_HIT_RADIUS = 24
+FIRE_KNOCKBACK = 12
+COLLISION_CELL_SIZE = 64  # spatial grid cell; at least the largest touch/hit radius
+
+TERRAIN_CHUNK_SIZE = 256  # terrain is pre-rendered in square chunks of this many pixels
+TERRAIN_CACHE_MB = 16  # resident chunk surfaces are capped at about this much memory
+GRASS_COLOR = (60, 120, 60)
+
+TEXT_CACHE_SIZE = 128  # rendered text surfaces kept for reuse
+HELP_LINES = [
+    "Dragon Quest - Free Roam",
+    "WASD/Arrows to move, Shift to dash",
+    "Space to breathe fire",
+    "Pick up gold and hearts",
+    "Avoid enemies or roast them",
+    "P to pause, H/? for help",
+]
+
 RNG_SEED = 1337
 
+# One byte of input per frame: keys held during the frame plus keys pressed in it
+INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_DASH, INPUT_FIRE, INPUT_PAUSE, INPUT_HELP = (
+    1 << bit for bit in range(8))
+HELD_KEY_BITS = {
+    pygame.K_w: INPUT_UP, pygame.K_UP: INPUT_UP,
+    pygame.K_s: INPUT_DOWN, pygame.K_DOWN: INPUT_DOWN,
+    pygame.K_a: INPUT_LEFT, pygame.K_LEFT: INPUT_LEFT,
+    pygame.K_d: INPUT_RIGHT, pygame.K_RIGHT: INPUT_RIGHT,
+    pygame.K_LSHIFT: INPUT_DASH, pygame.K_RSHIFT: INPUT_DASH,
+}
+
 
 # ------------------------------ Utilities ------------------------------
 
@@ -66,8 +105,58 @@ def vec_from_angle(deg: float) -> pygame.Vector2:
     return pygame.Vector2(math.cos(rad), math.sin(rad))
 
 
+class SimulatedClock:
+    """Game time that only moves when advanced, for deterministic runs."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.time = start
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance(self, dt: float) -> None:
+        self.time += dt
+
+
+_clock = time.perf_counter
+
+
 def now() -> float:
-    return time.perf_counter()
+    return _clock()
+
+
+def use_clock(clock) -> None:
+    """Make now() read ``clock`` (a SimulatedClock, or time.perf_counter for wall time)."""
+    global _clock
+    _clock = clock
+
+
+class InputKeys:
+    """Held keys decoded from an input mask, indexable like pygame.key.get_pressed()."""
+
+    def __init__(self, mask: int) -> None:
+        self.mask = mask
+
+    def __getitem__(self, key: int) -> bool:
+        return bool(self.mask & HELD_KEY_BITS.get(key, 0))
+
+
+def held_mask(keys) -> int:
+    mask = 0
+    for key, bit in HELD_KEY_BITS.items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+def timing_summary(samples: list[float]) -> dict:
+    """Mean and percentiles of durations in seconds, reported in milliseconds."""
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    pick = lambda pct: round(samples[min(len(samples) - 1, int(len(samples) * pct / 100))] * 1000, 3)
+    return {"mean": round(sum(samples) / len(samples) * 1000, 3), "p50": pick(50), "p95": pick(95),
+            "p99": pick(99), "max": round(samples[-1] * 1000, 3)}
 
 
 # ------------------------------ Entities -------------------------------
@@ -173,10 +262,99 @@ class Pickup:
     value: int
 
 
+# ------------------------------ Spatial index --------------------------
+
+class SpatialGrid:
+    """Uniform grid of list indices bucketed by position, for radius queries.
+
+    Each cell holds the indices of the items whose position falls in it, so a
+    query only looks at the cells its circle overlaps. Callers keep the grid
+    in step with their list: ``move`` after changing a position and
+    ``swap_remove`` to delete, which moves the last item into the freed slot
+    instead of shifting the whole list.
+    """
+
+    def __init__(self, cell_size: float = COLLISION_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
+    def key(self, pos) -> tuple[int, int]:
+        return int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)
+
+    def rebuild(self, items) -> None:
+        self.cells.clear()
+        for index, item in enumerate(items):
+            self.insert(index, item.pos)
+
+    def insert(self, index: int, pos) -> None:
+        key = self.key(pos)
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [index]
+        else:
+            cell.append(index)
+
+    def remove(self, index: int, pos) -> None:
+        key = self.key(pos)
+        cell = self.cells[key]
+        slot = cell.index(index)
+        cell[slot] = cell[-1]
+        cell.pop()
+        if not cell:
+            del self.cells[key]
+
+    def move(self, index: int, old_pos, new_pos) -> None:
+        if self.key(old_pos) != self.key(new_pos):
+            self.remove(index, old_pos)
+            self.insert(index, new_pos)
+
+    def swap_remove(self, items: list, index: int) -> None:
+        """Delete items[index] in O(1) by moving the last item into its slot."""
+        last = len(items) - 1
+        self.remove(index, items[index].pos)
+        if index != last:
+            self.remove(last, items[last].pos)
+            items[index] = items[last]
+            self.insert(index, items[index].pos)
+        items.pop()
+
+    def near(self, items: list, pos, radius: float) -> list[int]:
+        """Indices of items within ``radius`` of pos, highest first.
+
+        Highest first means the caller can ``swap_remove`` while walking the
+        result: the item moved into a freed slot always comes from beyond
+        the indices still to be visited.
+        """
+        x, y = pos
+        r2 = radius * radius
+        min_cx, min_cy = self.key((x - radius, y - radius))
+        max_cx, max_cy = self.key((x + radius, y + radius))
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for index in self.cells.get((cx, cy), ()):
+                    other = items[index].pos
+                    dx = other.x - x
+                    dy = other.y - y
+                    if dx * dx + dy * dy < r2:
+                        found.append(index)
+        found.sort(reverse=True)
+        return found
+
+
 # ------------------------------ World/Camera ---------------------------
 
 class World:
-    def __init__(self) -> None:
+    """Static terrain: grass with patches of forest and water.
+
+    The terrain never changes, so it is drawn into chunk surfaces of
+    ``chunk_size`` pixels the first time the camera needs them, and a frame
+    is just a few blits. Chunks are kept in least-recently-used order and
+    the oldest are dropped (and re-baked if the camera comes back) once
+    more than ``max_chunks`` would be resident.
+    """
+
+    def __init__(self, chunk_size: int = TERRAIN_CHUNK_SIZE, cache_mb: float = TERRAIN_CACHE_MB) -> None:
         random.seed(RNG_SEED)
         self.decor_rects: list[tuple[pygame.Rect, tuple[int, int, int]]] = []
         # Create simple patches of water and trees via rectangles
@@ -195,8 +373,52 @@ class World:
             color = random.choice([(30, 90, 130), (25, 80, 120)])  # water
             self.decor_rects.append((pygame.Rect(x, y, w, h), color))
 
+
+        self.chunk_size = chunk_size
+        # decor rects overlapping each chunk, in drawing order
+        self.chunk_decor: dict[tuple[int, int], list[int]] = {}
+        for index, (rect, _) in enumerate(self.decor_rects):
+            for cx in range(rect.left // chunk_size, (rect.right - 1) // chunk_size + 1):
+                for cy in range(rect.top // chunk_size, (rect.bottom - 1) // chunk_size + 1):
+                    self.chunk_decor.setdefault((cx, cy), []).append(index)
+        # never fewer chunks than one screen can show
+        on_screen = (-(-WINDOW_WIDTH // chunk_size) + 1) * (-(-WINDOW_HEIGHT // chunk_size) + 1)
+        self.max_chunks = max(on_screen, int(cache_mb * 1024 * 1024) // (chunk_size * chunk_size * 4))
+        self.chunks: OrderedDict[tuple[int, int], pygame.Surface] = OrderedDict()
+        self.chunks_baked = 0
+
+    def chunk(self, key: tuple[int, int]) -> pygame.Surface:
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self.chunks[key] = self.bake_chunk(key)
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def bake_chunk(self, key: tuple[int, int]) -> pygame.Surface:
+        area = pygame.Rect(key[0] * self.chunk_size, key[1] * self.chunk_size, self.chunk_size, self.chunk_size)
+        area = area.clip(pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT))
+        surface = pygame.Surface(area.size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(GRASS_COLOR)
+        for index in self.chunk_decor.get(key, ()):
+            rect, color = self.decor_rects[index]
+            pygame.draw.rect(surface, color, rect.move(-area.x, -area.y))
+        self.chunks_baked += 1
+        return surface
+
     def draw(self, surface: pygame.Surface, camera: pygame.Rect) -> None:
-        surface.fill((60, 120, 60))  # grass base
+        size = self.chunk_size
+        for cy in range(camera.top // size, (camera.bottom - 1) // size + 1):
+            for cx in range(camera.left // size, (camera.right - 1) // size + 1):
+                surface.blit(self.chunk((cx, cy)), (cx * size - camera.x, cy * size - camera.y))
+
+    def draw_uncached(self, surface: pygame.Surface, camera: pygame.Rect) -> None:
+        """Draw every decor rect near the camera directly; the reference for the chunk cache."""
+        surface.fill(GRASS_COLOR)
         for rect, color in self.decor_rects:
             if rect.colliderect(camera.inflate(200, 200)):
                 pygame.draw.rect(surface, color, rect.move(-camera.x, -camera.y))
@@ -213,16 +435,72 @@ class Camera:
         self.rect.y = clamp(self.rect.y, 0, WORLD_HEIGHT - self.rect.h)
 
 
+# ------------------------------ HUD ------------------------------------
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, color), least recently used dropped first."""
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.renders = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = font.render(text, True, color)
+            self.renders += 1
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+class HudLayer:
+    """An opaque HUD panel composed off screen and repainted only when the values it shows change.
+
+    ``paint(surface, *values)`` draws the panel in its own coordinates,
+    on a black background.
+    """
+
+    def __init__(self, rect, paint) -> None:
+        self.rect = pygame.Rect(rect)
+        self.surface = pygame.Surface(self.rect.size)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.paint = paint
+        self.values = None
+        self.repaints = 0
+
+    def draw(self, target: pygame.Surface, values: tuple = ()) -> None:
+        if values != self.values:
+            self.values = values
+            self.surface.fill((0, 0, 0))
+            self.paint(self.surface, *values)
+            self.repaints += 1
+        target.blit(self.surface, self.rect)
+
+
 # ------------------------------ Game -----------------------------------
 
 class Game:
-    def __init__(self) -> None:
+    def __init__(self, enemy_count: int = ENEMY_SPAWN_COUNT, clock: SimulatedClock | None = None) -> None:
+        # with a simulated clock every frame is exactly 1/FPS long and timers follow it
+        self.sim_clock = clock
+        use_clock(clock or time.perf_counter)
         pygame.init()
         pygame.display.set_caption("Dragon Quest - Free Roam")
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("Verdana", 18)
         self.big_font = pygame.font.SysFont("Verdana", 28, bold=True)
+        self.text_cache = TextCache()
+        self.status_panel = HudLayer((10, 10, 350, 86), self.paint_status)
+        self.score_panel = HudLayer((WINDOW_WIDTH - 220, 10, 210, 86), self.paint_score)
+        self.help_panel = HudLayer((8, WINDOW_HEIGHT - 18 * (len(HELP_LINES) + 1) - 6, 460, 24 + 18 * len(HELP_LINES)),
+                                   self.paint_help)
 
         self.world = World()
         self.camera = Camera()
@@ -231,15 +509,17 @@ class Game:
         self.enemies: list[Enemy] = []
         self.pickups: list[Pickup] = []
         self.projectiles: list[FireBolt] = []
+        self.enemy_grid = SpatialGrid()  # rebuilt every frame since enemies move
+        self.pickup_grid = SpatialGrid()  # kept in step as pickups come and go
 
         self.paused = False
         self.show_help = True
 
-        self.spawn_initial_enemies()
+        self.spawn_initial_enemies(enemy_count)
 
     # -------------------------- Spawning --------------------------
-    def spawn_initial_enemies(self) -> None:
-        for _ in range(ENEMY_SPAWN_COUNT):
+    def spawn_initial_enemies(self, count: int = ENEMY_SPAWN_COUNT) -> None:
+        for _ in range(count):
             x = random.uniform(0, WORLD_WIDTH)
             y = random.uniform(0, WORLD_HEIGHT)
             self.enemies.append(Enemy(x, y))
@@ -252,35 +532,47 @@ class Game:
             else:
                 heal = random.randint(*PICKUP_HEART_HEAL)
                 self.pickups.append(Pickup("heart", pos.copy(), heal))
+            self.pickup_grid.insert(len(self.pickups) - 1, pos)
 
     # -------------------------- Update ----------------------------
-    def handle_events(self) -> None:
+    def handle_events(self) -> int | None:
+        """Input bits for the keys pressed since the last frame, or None if the player quit."""
+        pressed = 0
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit(0)
+                return None
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_ESCAPE, pygame.K_q):
-                    pygame.quit()
-                    sys.exit(0)
+                    return None
                 if event.key == pygame.K_p:
-                    self.paused = not self.paused
+                    pressed ^= INPUT_PAUSE
                 if event.key in (pygame.K_h, pygame.K_SLASH):
-                    self.show_help = not self.show_help
-                if event.key == pygame.K_SPACE and self.dragon.can_fire() and not self.paused:
-                    self.projectiles.extend(self.dragon.fire())
-
-    def update(self, dt: float) -> None:
+                    pressed ^= INPUT_HELP
+                if event.key == pygame.K_SPACE:
+                    pressed |= INPUT_FIRE
+        return pressed
+
+    def apply_input(self, mask: int) -> None:
+        if mask & INPUT_PAUSE:
+            self.paused = not self.paused
+        if mask & INPUT_HELP:
+            self.show_help = not self.show_help
+        if mask & INPUT_FIRE and self.dragon.can_fire() and not self.paused:
+            self.projectiles.extend(self.dragon.fire())
+
+    def update(self, dt: float, keys) -> None:
         if self.paused:
             return
-        keys = pygame.key.get_pressed()
         self.dragon.update(dt, keys)
-        for e in self.enemies:
-            e.update(dt, self.dragon.pos)
+        self.update_enemies(dt)
         self.update_projectiles(dt)
         self.resolve_collisions()
         self.camera.update(self.dragon.pos)
 
+    def update_enemies(self, dt: float) -> None:
+        for e in self.enemies:
+            e.update(dt, self.dragon.pos)
+
     def update_projectiles(self, dt: float) -> None:
         now_time = now()
         alive: list[FireBolt] = []
@@ -293,36 +585,43 @@ class Game:
         self.projectiles = alive
 
     def resolve_collisions(self) -> None:
+        enemies = self.enemies
+        grid = self.enemy_grid
+        grid.rebuild(enemies)
+        dragon_pos = self.dragon.pos
+
         # Dragon vs enemies (touch damage)
-        for e in list(self.enemies):
-            if (e.pos - self.dragon.pos).length() < 28:
-                self.dragon.health -= ENEMY_DAMAGE * (1 / FPS) * 8  # small continuous damage
+        touching = len(grid.near(enemies, dragon_pos, DRAGON_TOUCH_RADIUS))
+        for _ in range(touching):
+            self.dragon.health -= ENEMY_DAMAGE * (1 / FPS) * 8  # small continuous damage
         self.dragon.health = int(clamp(self.dragon.health, 0, DRAGON_MAX_HEALTH))
 
         # Projectiles vs enemies
-        for bolt in list(self.projectiles):
-            for e in list(self.enemies):
-                if (e.pos - bolt.pos).length() < 24:
-                    e.health -= bolt.damage
-                    # knockback
-                    delta = e.pos - bolt.pos
-                    if delta.length() > 0:
-                        e.pos += delta.normalize() * 12
-                    # mark bolt expired
-                    bolt.expires_at = 0
-                    if e.health <= 0:
-                        self.spawn_loot(e.pos)
-                        self.enemies.remove(e)
-                        self.dragon.score += 25
+        for bolt in self.projectiles:
+            for index in grid.near(enemies, bolt.pos, FIRE_HIT_RADIUS):
+                e = enemies[index]
+                e.health -= bolt.damage
+                # knockback
+                delta = e.pos - bolt.pos
+                if delta.length_squared() > 0:
+                    old_pos = (e.pos.x, e.pos.y)
+                    e.pos += delta.normalize() * FIRE_KNOCKBACK
+                    grid.move(index, old_pos, e.pos)
+                # mark bolt expired
+                bolt.expires_at = 0
+                if e.health <= 0:
+                    self.spawn_loot(e.pos)
+                    grid.swap_remove(enemies, index)
+                    self.dragon.score += 25
 
         # Dragon vs pickups
-        for p in list(self.pickups):
-            if (p.pos - self.dragon.pos).length() < 28:
-                if p.kind == "gold":
-                    self.dragon.score += p.value
-                else:
-                    self.dragon.health = int(clamp(self.dragon.health + p.value, 0, DRAGON_MAX_HEALTH))
-                self.pickups.remove(p)
+        for index in self.pickup_grid.near(self.pickups, dragon_pos, DRAGON_TOUCH_RADIUS):
+            p = self.pickups[index]
+            if p.kind == "gold":
+                self.dragon.score += p.value
+            else:
+                self.dragon.health = int(clamp(self.dragon.health + p.value, 0, DRAGON_MAX_HEALTH))
+            self.pickup_grid.swap_remove(self.pickups, index)
 
     # -------------------------- Draw ------------------------------
     def draw(self) -> None:
@@ -344,21 +643,8 @@ class Game:
                     (screen_pos[0], screen_pos[1] + 10),
                 ])
 
-        # Draw enemies
-        for e in self.enemies:
-            screen_pos = (int(e.pos.x - cam.x), int(e.pos.y - cam.y))
-            pygame.draw.circle(self.screen, (40, 40, 40), screen_pos, 18)
-            pygame.draw.circle(self.screen, (180, 50, 50), screen_pos, 16)
-            # health ring
-            pct = clamp(e.health / ENEMY_MAX_HEALTH, 0, 1)
-            color = (int(255 * (1 - pct)), int(255 * pct), 40)
-            pygame.draw.circle(self.screen, color, screen_pos, 20, 2)
-
-        # Draw projectiles
-        for bolt in self.projectiles:
-            screen_pos = (int(bolt.pos.x - cam.x), int(bolt.pos.y - cam.y))
-            pygame.draw.circle(self.screen, (255, 150, 40), screen_pos, 5)
-            pygame.draw.circle(self.screen, (255, 220, 120), screen_pos, 3)
+        self.draw_enemies(cam)
+        self.draw_projectiles(cam)
 
         # Draw dragon (triangle)
         d = self.dragon
@@ -383,71 +669,231 @@ class Game:
         if self.show_help:
             self.draw_help()
 
+    def draw_enemies(self, cam: pygame.Rect) -> None:
+        for e in self.enemies:
+            self.draw_enemy(int(e.pos.x - cam.x), int(e.pos.y - cam.y), e.health)
+
+    def draw_enemy(self, x: int, y: int, health: float) -> None:
+        pygame.draw.circle(self.screen, (40, 40, 40), (x, y), 18)
+        pygame.draw.circle(self.screen, (180, 50, 50), (x, y), 16)
+        # health ring
+        pct = clamp(health / ENEMY_MAX_HEALTH, 0, 1)
+        color = (int(255 * (1 - pct)), int(255 * pct), 40)
+        pygame.draw.circle(self.screen, color, (x, y), 20, 2)
+
+    def draw_projectiles(self, cam: pygame.Rect) -> None:
+        for bolt in self.projectiles:
+            self.draw_bolt(int(bolt.pos.x - cam.x), int(bolt.pos.y - cam.y))
+
+    def draw_bolt(self, x: int, y: int) -> None:
+        pygame.draw.circle(self.screen, (255, 150, 40), (x, y), 5)
+        pygame.draw.circle(self.screen, (255, 220, 120), (x, y), 3)
+
+    def text(self, text: str, color: tuple[int, int, int], font: pygame.font.Font | None = None) -> pygame.Surface:
+        return self.text_cache.render(font or self.font, text, color)
+
     def draw_center_message(self, text: str) -> None:
-        s = self.big_font.render(text, True, (255, 255, 255))
+        s = self.text(text, (255, 255, 255), self.big_font)
         rect = s.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
         pygame.draw.rect(self.screen, (0, 0, 0), rect.inflate(20, 12))
         self.screen.blit(s, rect)
 
     def draw_hud(self) -> None:
-        # Panels
-        pygame.draw.rect(self.screen, (0, 0, 0), (10, 10, 350, 86))
-        pygame.draw.rect(self.screen, (0, 0, 0), (WINDOW_WIDTH - 220, 10, 210, 86))
-
-        # Health bar
+        # Bars are keyed by their width in pixels, so the panel is only repainted when one visibly moves
         hp_pct = clamp(self.dragon.health / DRAGON_MAX_HEALTH, 0, 1)
-        pygame.draw.rect(self.screen, (120, 40, 40), (18, 18, 330, 18))
-        pygame.draw.rect(self.screen, (220, 60, 60), (18, 18, int(330 * hp_pct), 18))
-        self.screen.blit(self.font.render("Health", True, (255, 255, 255)), (22, 18))
-
-        # Stamina bar
         st_pct = clamp(self.dragon.stamina / DRAGON_MAX_STAMINA, 0, 1)
-        pygame.draw.rect(self.screen, (40, 40, 80), (18, 42, 330, 18))
-        pygame.draw.rect(self.screen, (60, 80, 200), (18, 42, int(330 * st_pct), 18))
-        self.screen.blit(self.font.render("Stamina", True, (255, 255, 255)), (22, 42))
-
-        # Fire cooldown bar
         since_fire = now() - self.dragon.last_fire_time
         cd_pct = clamp(since_fire / FIRE_COOLDOWN_SEC, 0, 1)
-        pygame.draw.rect(self.screen, (80, 40, 0), (18, 66, 330, 18))
-        pygame.draw.rect(self.screen, (255, 160, 40), (18, 66, int(330 * cd_pct), 18))
-        self.screen.blit(self.font.render("Fire", True, (255, 255, 255)), (22, 66))
-
-        # Score panel
-        self.screen.blit(self.font.render(f"Score: {self.dragon.score}", True, (255, 255, 255)), (WINDOW_WIDTH - 208, 18))
-        self.screen.blit(self.font.render("P: Pause  H/?: Help", True, (220, 220, 220)), (WINDOW_WIDTH - 208, 42))
-        self.screen.blit(self.font.render("Esc/Q: Quit", True, (220, 220, 220)), (WINDOW_WIDTH - 208, 66))
+        self.status_panel.draw(self.screen, (int(330 * hp_pct), int(330 * st_pct), int(330 * cd_pct)))
+        self.score_panel.draw(self.screen, (self.dragon.score,))
+
+    def paint_status(self, surface: pygame.Surface, health_px: int, stamina_px: int, fire_px: int) -> None:
+        bars = (
+            ("Health", (120, 40, 40), (220, 60, 60), health_px),
+            ("Stamina", (40, 40, 80), (60, 80, 200), stamina_px),
+            ("Fire", (80, 40, 0), (255, 160, 40), fire_px),  # cooldown
+        )
+        for i, (label, empty_color, full_color, width) in enumerate(bars):
+            y = 8 + 24 * i
+            pygame.draw.rect(surface, empty_color, (8, y, 330, 18))
+            pygame.draw.rect(surface, full_color, (8, y, width, 18))
+            surface.blit(self.text(label, (255, 255, 255)), (12, y))
+
+    def paint_score(self, surface: pygame.Surface, score: int) -> None:
+        surface.blit(self.text(f"Score: {score}", (255, 255, 255)), (12, 8))
+        surface.blit(self.text("P: Pause  H/?: Help", (220, 220, 220)), (12, 32))
+        surface.blit(self.text("Esc/Q: Quit", (220, 220, 220)), (12, 56))
 
     def draw_help(self) -> None:
-        lines = [
-            "Dragon Quest - Free Roam",
-            "WASD/Arrows to move, Shift to dash",
-            "Space to breathe fire",
-            "Pick up gold and hearts",
-            "Avoid enemies or roast them",
-            "P to pause, H/? for help",
-        ]
-        x, y = 12, WINDOW_HEIGHT - 18 * (len(lines) + 1)
-        pygame.draw.rect(self.screen, (0, 0, 0), (x - 4, y - 6, 460, 24 + 18 * len(lines)))
-        for i, t in enumerate(lines):
-            self.screen.blit(self.font.render(t, True, (240, 240, 240)), (x, y + i * 18))
+        self.help_panel.draw(self.screen)
+
+    def paint_help(self, surface: pygame.Surface) -> None:
+        for i, line in enumerate(HELP_LINES):
+            surface.blit(self.text(line, (240, 240, 240)), (4, 6 + i * 18))
 
     # -------------------------- Main loop -------------------------
-    def run(self) -> None:
+    def run(self, inputs=None, recording: list[int] | None = None, timings: list | None = None,
+            max_frames: int | None = None, paced: bool = True) -> None:
+        """Play until the player quits, ``inputs`` run out or ``max_frames`` frames have passed.
+
+        ``inputs`` (one input mask per frame) replaces the keyboard,
+        ``recording`` receives every frame's mask and ``timings`` gets
+        (update seconds, draw seconds) per frame. With ``paced`` off frames
+        run back to back instead of at FPS.
+        """
+        inputs = iter(inputs) if inputs is not None else None
         last = now()
-        while True:
-            self.handle_events()
-            current = now()
-            dt = clamp(current - last, 0, 1/20)  # cap dt to avoid spiral
-            last = current
-            self.update(dt)
+        frame = 0
+        while max_frames is None or frame < max_frames:
+            pressed = self.handle_events()
+            if pressed is None:
+                break
+            if inputs is None:
+                mask = pressed | held_mask(pygame.key.get_pressed())
+            else:
+                mask = next(inputs, None)
+                if mask is None:
+                    break
+            if recording is not None:
+                recording.append(mask)
+
+            started = time.perf_counter()
+            self.apply_input(mask)
+            if self.sim_clock is not None:
+                dt = 1 / FPS
+                self.sim_clock.advance(dt)
+            else:
+                current = now()
+                dt = clamp(current - last, 0, 1/20)  # cap dt to avoid spiral
+                last = current
+            self.update(dt, InputKeys(mask))
+            updated = time.perf_counter()
             self.draw()
             pygame.display.flip()
-            self.clock.tick(FPS)
+            if timings is not None:
+                timings.append((updated - started, time.perf_counter() - updated))
+            frame += 1
+            if paced:
+                self.clock.tick(FPS)
 
+    def enemy_rows(self) -> list[tuple]:
+        return [(e.pos.x, e.pos.y, e.health, e.next_patrol_turn) for e in self.enemies]
 
-def main() -> None:
-    Game().run()
+    def bolt_rows(self) -> list[tuple]:
+        return [(b.pos.x, b.pos.y, b.vel.x, b.vel.y, b.expires_at) for b in self.projectiles]
+
+    def state_digest(self) -> str:
+        """SHA-256 over the dragon, every enemy, bolt and pickup, for comparing runs."""
+        d = self.dragon
+        enemies, bolts = self.enemy_rows(), self.bolt_rows()
+        digest = hashlib.sha256(struct.pack("<3I", len(enemies), len(bolts), len(self.pickups)))
+        rows = [(d.pos.x, d.pos.y, d.angle_deg, d.health, d.stamina, d.score, d.last_fire_time), *enemies, *bolts,
+                *((p.pos.x, p.pos.y, p.value) for p in self.pickups)]
+        for row in rows:
+            digest.update(struct.pack(f"<{len(row)}d", *row))
+        return digest.hexdigest()
+
+
+def bench_terrain(frames: int, speed: float = DRAGON_DASH_SPEED) -> dict:
+    """Pan the camera around the world and time World.draw against World.draw_uncached.
+
+    Every 50th frame the two are also compared pixel for pixel.
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    reference = pygame.Surface(screen.get_size()).convert()
+    world = World()
+    camera = Camera()
+    timings: dict[str, list[float]] = {"chunk_cache": [], "uncached": []}
+    mismatches = 0
+    # a wide ellipse around the world center, flown at dash speed
+    radius = pygame.Vector2(WORLD_WIDTH * 0.4, WORLD_HEIGHT * 0.4)
+    step = speed / FPS / radius.x
+    for frame in range(frames):
+        angle = frame * step
+        camera.update(pygame.Vector2(WORLD_WIDTH / 2 + radius.x * math.cos(angle),
+                                     WORLD_HEIGHT / 2 + radius.y * math.sin(angle * 1.7)))
+        for name, draw, target in (("chunk_cache", world.draw, screen), ("uncached", world.draw_uncached, reference)):
+            started = time.perf_counter()
+            draw(target, camera.rect)
+            timings[name].append(time.perf_counter() - started)
+        if frame % 50 == 0:
+            mismatches += pygame.image.tobytes(screen, "RGB") != pygame.image.tobytes(reference, "RGB")
+    report = {"frames": frames, "chunk_size": world.chunk_size, "max_chunks": world.max_chunks,
+              "resident_chunks": len(world.chunks), "chunks_baked": world.chunks_baked,
+              "pixel_mismatches": mismatches}
+    for name, samples in timings.items():
+        report[f"{name}_ms"] = timing_summary(samples)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Dragon Quest - Free Roam")
+    parser.add_argument("--enemies", type=int, default=ENEMY_SPAWN_COUNT, help="enemies to spawn at start")
+    parser.add_argument("--backend", choices=("objects", "numpy"), default="objects",
+                        help="one Python object per entity, or NumPy arrays for large crowds")
+    parser.add_argument("--bench-terrain", type=int, metavar="FRAMES",
+                        help="time terrain drawing with and without the chunk cache, print JSON and exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window, fixed timestep, unpaced; print a frame-time report as JSON")
+    parser.add_argument("--record", metavar="FILE", help="save this session's input (runs on the fixed timestep)")
+    parser.add_argument("--replay", metavar="FILE", help="play back recorded input instead of the keyboard")
+    parser.add_argument("--frames", type=int, help="stop after this many frames (headless default: 3600 "
+                                                   "frames of scripted demo input when not replaying)")
+    args = parser.parse_args(argv)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if args.bench_terrain:
+        print(json.dumps(bench_terrain(args.bench_terrain), indent=2))
+        return
+
+    # swarm.py and replay.py import this file as `main`; share this copy rather than load a second one
+    sys.modules.setdefault("main", sys.modules[__name__])
+    from replay import Recording, demo_inputs
+
+    inputs = None
+    if args.replay:
+        try:
+            recording = Recording.load(args.replay)
+        except (OSError, ValueError) as exc:
+            parser.error(str(exc))
+        if recording.fps != FPS:
+            parser.error(f"{args.replay} was recorded at {recording.fps} FPS, the game runs at {FPS}")
+        inputs, args.enemies, args.backend = recording.inputs, recording.enemies, recording.backend
+    elif args.headless:
+        inputs = demo_inputs(args.frames or 3600)
+
+    game_class = Game
+    if args.backend == "numpy":
+        try:
+            from swarm import SwarmGame
+        except ImportError as exc:
+            parser.error(f"the numpy backend needs NumPy ({exc})")
+        game_class = SwarmGame
+
+    deterministic = args.headless or args.record or args.replay
+    game = game_class(args.enemies, clock=SimulatedClock() if deterministic else None)
+    recorded: list[int] | None = [] if args.record else None
+    timings: list[tuple[float, float]] | None = [] if args.headless else None
+    game.run(inputs, recorded, timings, max_frames=args.frames, paced=not args.headless)
+    pygame.quit()
+
+    if recorded is not None:
+        Recording(recorded, args.enemies, args.backend).save(args.record)
+    if timings is not None:
+        print(json.dumps({
+            "backend": args.backend,
+            "enemies": args.enemies,
+            "frames": len(timings),
+            "simulated_sec": round(len(timings) / FPS, 3),
+            "enemies_left": len(game.enemies),
+            "score": game.dragon.score,
+            "state_sha256": game.state_digest(),
+            "update_ms": timing_summary([update for update, _ in timings]),
+            "draw_ms": timing_summary([draw for _, draw in timings]),
+            "frame_ms": timing_summary([update + draw for update, draw in timings]),
+        }, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Input recordings for Dragon Quest.
+
+A recording is everything needed to play a session again frame for
+frame: the game settings and one input byte per frame (see INPUT_* in
+main.py), zlib-compressed, since held keys rarely change between
+frames. Played back on the simulated clock it reproduces the session
+bit for bit.
+
+    python dragon_game/main.py --record run.dqin          # play and record
+    python dragon_game/main.py --headless --replay run.dqin
+"""
+
+import struct
+import zlib
+
+from main import (
+    FPS,
+    INPUT_DASH,
+    INPUT_DOWN,
+    INPUT_FIRE,
+    INPUT_LEFT,
+    INPUT_RIGHT,
+    INPUT_UP,
+)
+
+MAGIC = b"DQIN"
+VERSION = 1
+BACKENDS = ("objects", "numpy")
+# magic, version, fps, backend, enemy count, frame count
+HEADER = struct.Struct("<4sBHBII")
+
+
+class Recording:
+    def __init__(self, inputs: list[int], enemies: int, backend: str = "objects", fps: int = FPS) -> None:
+        self.inputs = inputs
+        self.enemies = enemies
+        self.backend = backend
+        self.fps = fps
+
+    def save(self, path: str) -> None:
+        header = HEADER.pack(MAGIC, VERSION, self.fps, BACKENDS.index(self.backend), self.enemies, len(self.inputs))
+        with open(path, "wb") as f:
+            f.write(header + zlib.compress(bytes(self.inputs), 9))
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: too short to be an input recording")
+        magic, version, fps, backend, enemies, frames = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} Dragon Quest input recording")
+        try:
+            inputs = zlib.decompress(data[HEADER.size:])
+        except zlib.error as exc:
+            raise ValueError(f"{path}: damaged input recording ({exc})") from None
+        if len(inputs) != frames:
+            raise ValueError(f"{path}: expected {frames} frames of input, found {len(inputs)}")
+        return cls(list(inputs), enemies, BACKENDS[backend], fps)
+
+
+def demo_inputs(frames: int) -> list[int]:
+    """A fixed scripted flight for benchmarks: turn every 1.5 s, dash every other leg, fire twice a second."""
+    headings = [INPUT_RIGHT, INPUT_RIGHT | INPUT_DOWN, INPUT_DOWN, INPUT_DOWN | INPUT_LEFT,
+                INPUT_LEFT, INPUT_LEFT | INPUT_UP, INPUT_UP, INPUT_UP | INPUT_RIGHT]
+    leg = FPS * 3 // 2
+    inputs = []
+    for frame in range(frames):
+        mask = headings[frame // leg % len(headings)]
+        if frame // leg % 2 and frame % leg < leg // 3:
+            mask |= INPUT_DASH
+        if frame % (FPS // 2) == 0:
+            mask |= INPUT_FIRE
+        inputs.append(mask)
+    return inputs
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Struct-of-arrays entity backend for Dragon Quest (NumPy).
+
+Enemies and fire bolts live in contiguous NumPy arrays (positions,
+velocities, health, timers) instead of one Python object each, and
+movement, steering, clamping and bolt expiry run as whole-array
+operations once per frame. The rules are the same as Enemy.update and
+Game.update_projectiles; only patrol turns drop back to Python, so they
+draw from `random` in the same order as the object backend.
+
+    python dragon_game/main.py --backend numpy --enemies 10000
+"""
+
+from __future__ import annotations
+
+import math
+import random
+
+import numpy as np
+import pygame
+
+from main import (
+    DRAGON_MAX_HEALTH,
+    DRAGON_TOUCH_RADIUS,
+    ENEMY_DAMAGE,
+    ENEMY_MAX_HEALTH,
+    ENEMY_PATROL_TURN_SEC,
+    ENEMY_SENSE_RADIUS,
+    ENEMY_SPAWN_COUNT,
+    ENEMY_SPEED,
+    FIRE_HIT_RADIUS,
+    FIRE_KNOCKBACK,
+    FPS,
+    WORLD_HEIGHT,
+    WORLD_WIDTH,
+    Game,
+    clamp,
+    now,
+)
+
+DRAW_MARGIN = 24  # enemy sprites reach 20px past their center
+
+
+class EnemySwarm:
+    """All enemies as parallel arrays; row i is one enemy."""
+
+    def __init__(self) -> None:
+        self.pos = np.empty((0, 2))
+        self.vel = np.empty((0, 2))
+        self.health = np.empty(0, dtype=int)
+        self.next_patrol_turn = np.empty(0)
+        self.patrol_dir = np.empty((0, 2))
+
+    def __len__(self) -> int:
+        return len(self.health)
+
+    def spawn(self, count: int) -> None:
+        """Add ``count`` enemies at random spots, drawing from `random` in the same order as
+        Game.spawn_initial_enemies and Enemy.__init__."""
+        points, turns, dirs = [], [], []
+        for _ in range(count):
+            points.append((random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT)))
+            turns.append(now() + random.uniform(*ENEMY_PATROL_TURN_SEC))
+            rad = math.radians(random.uniform(0, 360))
+            dirs.append((math.cos(rad), math.sin(rad)))
+        self.pos = np.concatenate([self.pos, np.array(points, dtype=float).reshape(-1, 2)])
+        self.vel = np.concatenate([self.vel, np.zeros((count, 2))])
+        self.health = np.concatenate([self.health, np.full(count, ENEMY_MAX_HEALTH)])
+        self.next_patrol_turn = np.concatenate([self.next_patrol_turn, turns])
+        self.patrol_dir = np.concatenate([self.patrol_dir, np.array(dirs).reshape(-1, 2)])
+
+    def update(self, dt: float, dragon_pos: pygame.Vector2) -> None:
+        to_dragon = np.array((dragon_pos.x, dragon_pos.y)) - self.pos
+        dist = np.sqrt(to_dragon[:, 0] * to_dragon[:, 0] + to_dragon[:, 1] * to_dragon[:, 1])
+        chasing = dist < ENEMY_SENSE_RADIUS
+
+        now_time = now()
+        for index in np.flatnonzero(~chasing & (now_time > self.next_patrol_turn)).tolist():
+            rad = math.radians(random.uniform(0, 360))
+            self.patrol_dir[index] = (math.cos(rad), math.sin(rad))
+            self.next_patrol_turn[index] = now_time + random.uniform(*ENEMY_PATROL_TURN_SEC)
+
+        self.vel = self.patrol_dir * (ENEMY_SPEED * 0.5)
+        closing = chasing & (dist > 1e-2)
+        self.vel[closing] = to_dragon[closing] / dist[closing, None] * ENEMY_SPEED
+        self.vel[chasing & ~closing] = 0.0
+        self.pos += self.vel * dt
+        np.clip(self.pos[:, 0], 0, WORLD_WIDTH, out=self.pos[:, 0])
+        np.clip(self.pos[:, 1], 0, WORLD_HEIGHT, out=self.pos[:, 1])
+
+    def swap_remove(self, index: int) -> None:
+        """Delete row ``index`` by moving the last row into it, like SpatialGrid.swap_remove,
+        so enemies keep the same order as in the object backend."""
+        last = len(self) - 1
+        for name in ('pos', 'vel', 'health', 'next_patrol_turn', 'patrol_dir'):
+            column = getattr(self, name)
+            column[index] = column[last]
+            setattr(self, name, column[:last])
+
+
+class BoltSwarm:
+    """All fire bolts in flight as parallel arrays."""
+
+    def __init__(self) -> None:
+        self.pos = np.empty((0, 2))
+        self.vel = np.empty((0, 2))
+        self.expires_at = np.empty(0)
+        self.damage = np.empty(0, dtype=int)
+
+    def __len__(self) -> int:
+        return len(self.expires_at)
+
+    def extend(self, bolts) -> None:
+        """Add FireBolt objects, as returned by Dragon.fire."""
+        bolts = list(bolts)
+        if not bolts:
+            return
+        self.pos = np.concatenate([self.pos, [(b.pos.x, b.pos.y) for b in bolts]])
+        self.vel = np.concatenate([self.vel, [(b.vel.x, b.vel.y) for b in bolts]])
+        self.expires_at = np.concatenate([self.expires_at, [b.expires_at for b in bolts]])
+        self.damage = np.concatenate([self.damage, [b.damage for b in bolts]])
+
+    def update(self, dt: float) -> None:
+        alive = now() <= self.expires_at
+        self.pos[alive] += self.vel[alive] * dt
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        self.keep(alive & (x >= 0) & (x <= WORLD_WIDTH) & (y >= 0) & (y <= WORLD_HEIGHT))
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.pos = self.pos[mask]
+        self.vel = self.vel[mask]
+        self.expires_at = self.expires_at[mask]
+        self.damage = self.damage[mask]
+
+
+class SwarmGame(Game):
+    """Game whose enemies and bolts are an EnemySwarm and a BoltSwarm."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.projectiles = BoltSwarm()
+
+    def spawn_initial_enemies(self, count: int = ENEMY_SPAWN_COUNT) -> None:
+        self.enemies = EnemySwarm()
+        self.enemies.spawn(count)
+
+    def update_enemies(self, dt: float) -> None:
+        self.enemies.update(dt, self.dragon.pos)
+
+    def update_projectiles(self, dt: float) -> None:
+        self.projectiles.update(dt)
+
+    def resolve_collisions(self) -> None:
+        enemies, bolts = self.enemies, self.projectiles
+        dragon_pos = self.dragon.pos
+
+        # Dragon vs enemies (touch damage)
+        offset = enemies.pos - (dragon_pos.x, dragon_pos.y)
+        touching = np.count_nonzero((offset * offset).sum(axis=1) < DRAGON_TOUCH_RADIUS * DRAGON_TOUCH_RADIUS)
+        for _ in range(touching):
+            self.dragon.health -= ENEMY_DAMAGE * (1 / FPS) * 8  # small continuous damage
+        self.dragon.health = int(clamp(self.dragon.health, 0, DRAGON_MAX_HEALTH))
+
+        # Projectiles vs enemies, bolt by bolt as in Game, among the enemies near any bolt
+        if len(bolts) and len(enemies):
+            low = bolts.pos.min(axis=0) - FIRE_HIT_RADIUS
+            high = bolts.pos.max(axis=0) + FIRE_HIT_RADIUS
+            near = np.flatnonzero(((enemies.pos >= low) & (enemies.pos <= high)).all(axis=1))
+            r2 = FIRE_HIT_RADIUS * FIRE_HIT_RADIUS
+            for b in range(len(bolts)):
+                offset = enemies.pos[near] - bolts.pos[b]
+                hits = np.sort(near[(offset * offset).sum(axis=1) < r2])
+                # highest first, so a swap-remove only moves rows that were already visited
+                for index in hits[::-1].tolist():
+                    enemies.health[index] -= bolts.damage[b]
+                    # knockback
+                    dx, dy = enemies.pos[index] - bolts.pos[b]
+                    length = math.sqrt(dx * dx + dy * dy)
+                    if length > 0:
+                        enemies.pos[index] += (dx / length * FIRE_KNOCKBACK, dy / length * FIRE_KNOCKBACK)
+                    # mark bolt expired
+                    bolts.expires_at[b] = 0
+                    if enemies.health[index] <= 0:
+                        self.spawn_loot(pygame.Vector2(*enemies.pos[index]))
+                        last = len(enemies) - 1
+                        enemies.swap_remove(index)
+                        near = near[near != index]
+                        near[near == last] = index
+                        self.dragon.score += 25
+
+        # Dragon vs pickups
+        for index in self.pickup_grid.near(self.pickups, dragon_pos, DRAGON_TOUCH_RADIUS):
+            p = self.pickups[index]
+            if p.kind == "gold":
+                self.dragon.score += p.value
+            else:
+                self.dragon.health = int(clamp(self.dragon.health + p.value, 0, DRAGON_MAX_HEALTH))
+            self.pickup_grid.swap_remove(self.pickups, index)
+
+    def enemy_rows(self) -> list[tuple]:
+        enemies = self.enemies
+        return list(zip(enemies.pos[:, 0].tolist(), enemies.pos[:, 1].tolist(), enemies.health.tolist(),
+                        enemies.next_patrol_turn.tolist()))
+
+    def bolt_rows(self) -> list[tuple]:
+        bolts = self.projectiles
+        return list(zip(bolts.pos[:, 0].tolist(), bolts.pos[:, 1].tolist(), bolts.vel[:, 0].tolist(),
+                        bolts.vel[:, 1].tolist(), bolts.expires_at.tolist()))
+
+    def draw_enemies(self, cam: pygame.Rect) -> None:
+        for x, y, health in self._on_screen(self.enemies.pos, cam, self.enemies.health):
+            self.draw_enemy(x, y, health)
+
+    def draw_projectiles(self, cam: pygame.Rect) -> None:
+        for x, y, _ in self._on_screen(self.projectiles.pos, cam):
+            self.draw_bolt(x, y)
+
+    @staticmethod
+    def _on_screen(pos: np.ndarray, cam: pygame.Rect, values: np.ndarray | None = None):
+        """(screen x, screen y, value) for every entity whose sprite overlaps the camera."""
+        screen = pos - (cam.x, cam.y)
+        visible = ((screen >= -DRAW_MARGIN) & (screen <= (cam.w + DRAW_MARGIN, cam.h + DRAW_MARGIN))).all(axis=1)
+        xy = screen[visible].astype(int).tolist()
+        shown = values[visible].tolist() if values is not None else [None] * len(xy)
+        return [(x, y, value) for (x, y), value in zip(xy, shown)]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Session loop shared by the terminal games.
+
+Games are played back to back by a plain loop rather than by the game
+function calling itself, so a kiosk can run for days without the stack
+growing. SessionStats keeps running totals in constant memory, and
+soak() drives a whole session with a scripted player for unattended
+test runs.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class SessionStats:
+    """Running win rate, length histogram and streaks for one session.
+
+    ``histogram[n]`` counts games that took n attempts (or rounds); the
+    last bucket also holds everything longer, so memory stays constant
+    however many games are played.
+    """
+
+    def __init__(self, histogram_size):
+        self.games = 0
+        self.wins = 0
+        self.histogram = [0] * histogram_size
+        self.streak = 0  # +n after n wins in a row, -n after n losses
+        self.best_win_streak = 0
+        self.worst_losing_streak = 0
+
+    @property
+    def losses(self):
+        return self.games - self.wins
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    def record(self, won, length):
+        self.games += 1
+        self.histogram[min(length, len(self.histogram) - 1)] += 1
+        if won:
+            self.wins += 1
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.best_win_streak = max(self.best_win_streak, self.streak)
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            self.worst_losing_streak = max(self.worst_losing_streak, -self.streak)
+
+    def as_dict(self):
+        last = len(self.histogram) - 1
+        return {
+            'games': self.games,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': round(self.win_rate, 4),
+            'best_win_streak': self.best_win_streak,
+            'worst_losing_streak': self.worst_losing_streak,
+            'histogram': {(f'{n}+' if n == last else str(n)): count
+                          for n, count in enumerate(self.histogram) if count},
+        }
+
+    def print_summary(self, unit):
+        print(f"\n📊 Session: {self.games} games, {self.wins} won ({self.win_rate:.0%}), "
+              f"best winning streak {self.best_win_streak}")
+        last = len(self.histogram) - 1
+        for n, count in enumerate(self.histogram):
+            if count:
+                print(f"   {n}{'+' if n == last else ''} {unit}: {count}")
+
+
+def run_session(play_game, play_again, stats, max_games=None):
+    """Play games until ``play_again(won)`` says stop (or ``max_games`` is reached).
+
+    ``play_game()`` plays one game and returns ``(won, length)``.
+    """
+    while True:
+        won, length = play_game()
+        stats.record(won, length)
+        if max_games is not None and stats.games >= max_games:
+            return stats
+        if not play_again(won):
+            return stats
+
+
+def max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+
+def soak(run, games):
+    """Run a scripted session of ``games`` games with output discarded and report throughput and memory.
+
+    ``run(games)`` plays the session and returns its SessionStats.
+    """
+    rss_before = max_rss_kb()
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        stats = run(games)
+    elapsed = time.perf_counter() - started
+    report = stats.as_dict()
+    report.update({
+        'elapsed_sec': round(elapsed, 3),
+        'games_per_sec': round(stats.games / elapsed, 1) if elapsed else 0.0,
+        'max_rss_growth_kb': max_rss_kb() - rss_before if resource else None,
+    })
+    print(json.dumps(report, indent=2))
+    return stats
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+🧮 Strategy lab for the Magical Number Quest 🧮
+
+Computes the exact win probability and expected attempts of a guessing
+policy over every secret number at once, so the difficulty table in
+number_guessing_game.py can be tuned from numbers instead of by feel.
+
+Policies:
+- bisect: guess the middle of the numbers still possible. Without hints
+  this is plain binary search; with hints the range is also narrowed by
+  the hot/cold band of each miss.
+- random: guess uniformly among the numbers still possible.
+- optimal: the guesses that maximize the chance of winning, solved by
+  dynamic programming over range sizes.
+
+    python3 guess_strategy.py
+    python3 guess_strategy.py --max-num 1000000 --attempts 20 --no-hints
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from number_guessing_game import DIFFICULTIES, hint_distance_limits
+
+
+@dataclass
+class StrategyResult:
+    policy: str
+    max_num: int
+    max_attempts: int
+    hints: bool
+    win_probability: float
+    expected_attempts: float  # mean attempts over the games that are won
+
+
+# ------------------------------ Hint bands ------------------------------
+
+def band_edges(max_num, hints=True):
+    """Upper distance of every feedback band; a miss at distance d lands in the first band with d <= edge."""
+    limits = hint_distance_limits(max_num) if hints else ()
+    return np.array(limits + (max_num,), dtype=np.int64)
+
+
+def _side_totals(values, edges):
+    """For every side length a, sum ``values`` (indexed by range size) over the pieces a miss on that side leaves."""
+    lengths = np.arange(len(values))
+    total = np.zeros_like(values)
+    lower = 0
+    for upper in edges:
+        total += values[np.clip(np.minimum(lengths, upper) - lower, 0, None)]
+        lower = upper
+    return total
+
+
+# ------------------------------ Evaluation ------------------------------
+
+def bisect_policy(lo, hi, guesses_left):
+    """Guess the middle of each range."""
+    return (lo + hi) // 2
+
+
+def evaluate(policy, max_num, max_attempts, hints=True, name=None):
+    """Play a deterministic ``policy`` against every secret in 1..max_num at once.
+
+    ``policy(lo, hi, guesses_left)`` gets arrays with the range still
+    possible for each game in play and returns an array of guesses.
+    """
+    edges = band_edges(max_num, hints)
+    lower_edges = np.concatenate(([0], edges[:-1]))
+    secrets = np.arange(1, max_num + 1, dtype=np.int64)
+    lo = np.ones(max_num, dtype=np.int64)
+    hi = np.full(max_num, max_num, dtype=np.int64)
+    found_on = np.zeros(max_num, dtype=np.int64)  # attempt that found each secret, 0 if never
+    playing = np.arange(max_num)
+
+    for attempt in range(1, max_attempts + 1):
+        if not len(playing):
+            break
+        secret, low, high = secrets[playing], lo[playing], hi[playing]
+        guess = policy(low, high, max_attempts - attempt + 1)
+        hit = guess == secret
+        found_on[playing[hit]] = attempt
+
+        miss = ~hit
+        playing, secret, low, high, guess = playing[miss], secret[miss], low[miss], high[miss], guess[miss]
+        band = np.searchsorted(edges, np.abs(secret - guess))
+        near, far = lower_edges[band] + 1, edges[band]
+        higher = secret > guess
+        lo[playing] = np.where(higher, np.maximum(low, guess + near), np.maximum(low, guess - far))
+        hi[playing] = np.where(higher, np.minimum(high, guess + far), np.minimum(high, guess - near))
+
+    won = found_on[found_on > 0]
+    return StrategyResult(
+        policy=name or getattr(policy, '__name__', type(policy).__name__),
+        max_num=max_num,
+        max_attempts=max_attempts,
+        hints=hints,
+        win_probability=len(won) / max_num,
+        expected_attempts=float(won.mean()) if len(won) else 0.0,
+    )
+
+
+def evaluate_random(max_num, max_attempts, hints=True):
+    """Exact results for guessing uniformly among the numbers still possible.
+
+    With j guesses left, found[m] is the expected number of secrets of an
+    m-number range that get found and spent[m] the attempts they take in
+    total. Every guess position is equally likely, so averaging over
+    positions is a prefix sum and each guess costs O(range) array work.
+    """
+    edges = band_edges(max_num, hints)
+    sizes = np.arange(1, max_num + 1)
+    found = np.zeros(max_num + 1)
+    spent = np.zeros(max_num + 1)
+    for _ in range(max_attempts):
+        below_found = np.cumsum(_side_totals(found, edges))[:-1]
+        below_spent = np.cumsum(_side_totals(spent, edges))[:-1]
+        found[1:], spent[1:] = 1 + 2 * below_found / sizes, 2 * below_spent / sizes
+        spent[1:] += found[1:]
+    return StrategyResult('random', max_num, max_attempts, hints,
+                          win_probability=found[max_num] / max_num,
+                          expected_attempts=spent[max_num] / found[max_num])
+
+
+# ------------------------------ Optimal policy ------------------------------
+
+def _best_splits(side):
+    """For every total M, the a in 0..M maximizing side[a] + side[M - a], ties going to the evenest split.
+
+    ``side`` is piecewise linear, so the sum peaks at the even split or
+    where a or M - a sits on a corner of it; by symmetry only a needs to
+    try the corners.
+    """
+    size = len(side) - 1
+    corners = np.flatnonzero(np.diff(side, 2)) + 1
+    totals = np.arange(size, dtype=np.int64)
+    split = totals // 2
+    best = side[split] + side[totals - split]
+    for a in np.concatenate(([0], corners[corners < size])):
+        value = side[a] + side[:size - a]
+        even = np.minimum(a, totals[:size - a])
+        current, chosen = best[a:], split[a:]
+        better = (value > current) | ((value == current) & (even > chosen))
+        current[better] = value[better]
+        chosen[better] = even[better]
+    return best, split
+
+
+class OptimalPolicy:
+    """Guesses that maximize the chance of winning, by dynamic programming.
+
+    After any miss the numbers still possible form a range, and how a
+    range splits depends only on its size and where the guess falls, so
+    the state is (range size, guesses left). With j guesses, the most
+    secrets an m-number range can yield is one for the guess plus the
+    best over ``a`` numbers below it of side(a) + side(m - 1 - a), where
+    side() sums the (j - 1)-guess values over the pieces a hint leaves.
+    """
+
+    def __init__(self, max_num, max_attempts, hints=True):
+        edges = band_edges(max_num, hints)
+        sizes = np.arange(max_num + 1)
+        wins = np.zeros(max_num + 1, dtype=np.int64)
+        self.splits = []  # splits[j - 1][m - 1]: numbers to leave below the guess in an m-range, j guesses left
+        for _ in range(max_attempts):
+            if wins[max_num] == max_num:
+                break  # every range up to max_num is already certain; more guesses change nothing
+            best, split = _best_splits(_side_totals(wins, edges))
+            wins = np.minimum(sizes, np.concatenate(([0], best + 1)))
+            self.splits.append(split.astype(np.int32))
+        self.win_probability = wins[max_num] / max_num
+
+    def __call__(self, lo, hi, guesses_left):
+        layer = self.splits[min(guesses_left, len(self.splits)) - 1]
+        return lo + layer[hi - lo]
+
+
+# ------------------------------ Reports ------------------------------
+
+def compare_policies(max_num, max_attempts, hints=True):
+    """Every policy on one difficulty, with how long each took."""
+    results = []
+    for name, run in (
+        ('bisect', lambda: evaluate(bisect_policy, max_num, max_attempts, hints, name='bisect')),
+        ('random', lambda: evaluate_random(max_num, max_attempts, hints)),
+        ('optimal', lambda: evaluate(OptimalPolicy(max_num, max_attempts, hints), max_num, max_attempts, hints,
+                                     name='optimal')),
+    ):
+        started = time.perf_counter()
+        result = run()
+        results.append((result, time.perf_counter() - started))
+    return results
+
+
+def print_report(title, max_num, max_attempts, hints_options):
+    print(f"\n🎯 {title}: 1-{max_num}, {max_attempts} attempts")
+    print(f"   {'policy':<8} {'hints':<6} {'win %':>8} {'avg attempts':>13} {'time':>9}")
+    for hints in hints_options:
+        for result, seconds in compare_policies(max_num, max_attempts, hints):
+            print(f"   {result.policy:<8} {'on' if hints else 'off':<6} {result.win_probability * 100:>7.2f}% "
+                  f"{result.expected_attempts:>13.3f} {seconds * 1000:>7.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exact win rates of guessing policies for the Number Quest')
+    parser.add_argument('--max-num', type=int, help='analyze one range 1..MAX_NUM instead of the difficulty table')
+    parser.add_argument('--attempts', type=int, default=20, help='attempts allowed with --max-num')
+    parser.add_argument('--no-hints', action='store_true', help='only use higher/lower feedback')
+    args = parser.parse_args(argv)
+
+    hints_options = (False,) if args.no_hints else (False, True)
+    if args.max_num:
+        print_report('Custom', args.max_num, args.attempts, hints_options)
+    else:
+        for max_num, max_attempts, title in DIFFICULTIES.values():
+            print_report(title, max_num, max_attempts, hints_options)
+
+
+if __name__ == "__main__":
+    main()
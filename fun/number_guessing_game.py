@@ -4,9 +4,31 @@
 An epic adventure where you must guess the mystical number to save the kingdom!
 """
 
+import argparse
 import random
 import sys
 import time
+from typing import NamedTuple, Optional
+
+from game_session import SessionStats, run_session, soak
+
+# Quest difficulties: menu choice -> (max number, attempts, title)
+DIFFICULTIES = {
+    1: (50, 8, "Novice"),
+    2: (100, 6, "Adept"),
+    3: (200, 5, "Master"),
+    4: (500, 4, "Legend"),
+}
+
+# Hint bands: distance as a percentage of the range -> hint, checked in order
+HINT_BANDS = (
+    (5, "🔥 BLAZING HOT! The magic is almost within your grasp!"),
+    (10, "🌡️ Very warm! The mystical energy is strong here!"),
+    (20, "🌤️ Getting warmer! You can feel the magic nearby!"),
+    (35, "🌬️ Lukewarm... The ancient forces are stirring!"),
+    (50, "❄️ Cold... The magic is distant but not lost!"),
+)
+FREEZING_HINT = "🧊 Freezing cold! You're far from the mystical number!"
 
 def print_ascii_art():
     """Print cool ASCII art for the game."""
@@ -21,7 +43,7 @@ def print_ascii_art():
     ╚══════════════════════════════════════════════════════════════╝
     """)
 
-def get_difficulty():
+def get_difficulty(prompt=input):
     """Let player choose difficulty level."""
     print("\n🌟 Choose your quest difficulty: 🌟")
     print("1. 🟢 Novice (1-50, 8 attempts)")
@@ -31,37 +53,90 @@ def get_difficulty():
     
     while True:
         try:
-            choice = int(input("\nEnter your choice (1-4): "))
-            if choice == 1:
-                return 50, 8, "Novice"
-            elif choice == 2:
-                return 100, 6, "Adept"
-            elif choice == 3:
-                return 200, 5, "Master"
-            elif choice == 4:
-                return 500, 4, "Legend"
+            choice = int(prompt("\nEnter your choice (1-4): "))
+            if choice in DIFFICULTIES:
+                return DIFFICULTIES[choice]
             else:
                 print("❌ Please choose 1, 2, 3, or 4!")
         except ValueError:
             print("❌ Please enter a valid number!")
 
-def get_magical_hint(secret_number, guess, max_num):
-    """Provide magical hints based on how close the guess is."""
+HINTS = tuple(hint for _, hint in HINT_BANDS) + (FREEZING_HINT,)
+
+# Outcomes of a guess
+CORRECT = "correct"
+HIGHER = "higher"
+LOWER = "lower"
+OUT_OF_RANGE = "out_of_range"
+
+def get_hint_band(secret_number, guess, max_num):
+    """Index into HINTS of the band the guess's distance falls in."""
     difference = abs(secret_number - guess)
     percentage = (difference / max_num) * 100
     
-    if percentage <= 5:
-        return "🔥 BLAZING HOT! The magic is almost within your grasp!"
-    elif percentage <= 10:
-        return "🌡️ Very warm! The mystical energy is strong here!"
-    elif percentage <= 20:
-        return "🌤️ Getting warmer! You can feel the magic nearby!"
-    elif percentage <= 35:
-        return "🌬️ Lukewarm... The ancient forces are stirring!"
-    elif percentage <= 50:
-        return "❄️ Cold... The magic is distant but not lost!"
-    else:
-        return "🧊 Freezing cold! You're far from the mystical number!"
+    for band, (threshold, _) in enumerate(HINT_BANDS):
+        if percentage <= threshold:
+            return band
+    return len(HINT_BANDS)
+
+def hint_distance_limits(max_num):
+    """Largest distance that still gets each hint in HINT_BANDS, using get_hint_band's exact float test."""
+    limits = []
+    for threshold, _ in HINT_BANDS:
+        distance = int(threshold * max_num / 100)
+        while distance > 0 and (distance / max_num) * 100 > threshold:
+            distance -= 1
+        while distance < max_num and ((distance + 1) / max_num) * 100 <= threshold:
+            distance += 1
+        limits.append(distance)
+    return tuple(limits)
+
+def get_magical_hint(secret_number, guess, max_num):
+    """Provide magical hints based on how close the guess is."""
+    return HINTS[get_hint_band(secret_number, guess, max_num)]
+
+class GuessResult(NamedTuple):
+    outcome: str  # CORRECT, HIGHER (the secret is higher), LOWER or OUT_OF_RANGE
+    hint: Optional[str]  # magical hint after a miss
+    band: Optional[int]  # index of the hint in HINTS
+    attempts_remaining: int
+
+class NumberQuestEngine:
+    """The rules of one quest, with no input, output or delays.
+
+    The console game and the bot runners both drive it through
+    ``guess()``. Out-of-range guesses are refused without using up an
+    attempt, as the console game always did.
+    """
+
+    def __init__(self, max_num, max_attempts, secret_number=None, rng=random):
+        self.max_num = max_num
+        self.max_attempts = max_attempts
+        self.secret_number = rng.randint(1, max_num) if secret_number is None else secret_number
+        self.attempts = 0
+        self.won = False
+
+    @property
+    def attempts_remaining(self):
+        return self.max_attempts - self.attempts
+
+    @property
+    def over(self):
+        return self.won or self.attempts >= self.max_attempts
+
+    def guess(self, guess):
+        """Play one guess and return its GuessResult."""
+        if self.over:
+            raise RuntimeError("The quest is already over")
+        if guess < 1 or guess > self.max_num:
+            return GuessResult(OUT_OF_RANGE, None, None, self.attempts_remaining)
+        self.attempts += 1
+        if guess == self.secret_number:
+            self.won = True
+            return GuessResult(CORRECT, None, None, self.attempts_remaining)
+        band = get_hint_band(self.secret_number, guess, self.max_num)
+        outcome = HIGHER if guess < self.secret_number else LOWER
+        return GuessResult(outcome, HINTS[band], band, self.attempts_remaining)
 
 def animate_guess():
     """Animate the guessing process."""
@@ -95,67 +170,55 @@ def celebrate_victory(attempts, difficulty):
     print(f"   Attempts: {attempts}")
     print("   Status: VICTORIOUS! 🏆")
 
-def play_number_guessing_game():
-    """Main game function for the magical number quest."""
+def play_quest(prompt=input, animate=True):
+    """Play one quest and return (won, attempts)."""
     print_ascii_art()
     
     # Get difficulty
-    max_num, max_attempts, difficulty = get_difficulty()
+    max_num, max_attempts, difficulty = get_difficulty(prompt)
     
     print(f"\n🧙‍♂️ Welcome, brave {difficulty}! The wizard has hidden a number between 1 and {max_num}!")
     print(f"🎯 You have {max_attempts} attempts to guess the mystical number!")
     print("🌟 May the ancient magic guide your way!")
     print("-" * 60)
     
-    # Generate random number
-    secret_number = random.randint(1, max_num)
-    attempts = 0
+    quest = NumberQuestEngine(max_num, max_attempts)
     
-    while attempts < max_attempts:
+    while not quest.over:
         try:
-            print(f"\n⚔️  Attempt {attempts + 1}/{max_attempts}")
-            guess = int(input(f"🔮 Enter your mystical guess (1-{max_num}): "))
-            attempts += 1
+            print(f"\n⚔️  Attempt {quest.attempts + 1}/{max_attempts}")
+            guess = int(prompt(f"🔮 Enter your mystical guess (1-{max_num}): "))
+            result = quest.guess(guess)
             
             # Validate input
-            if guess < 1 or guess > max_num:
+            if result.outcome == OUT_OF_RANGE:
                 print("❌ The wizard frowns... Please enter a number in the valid range!")
-                attempts -= 1
                 continue
             
             # Animate the guess
-            animate_guess()
+            if animate:
+                animate_guess()
             
             # Check guess
-            if guess == secret_number:
-                celebrate_victory(attempts, difficulty)
-                
-                # Ask if they want to play again
-                play_again = input("\n🌟 Would you like to embark on another quest? (y/n): ").lower().strip()
-                if play_again in ['y', 'yes']:
-                    return play_number_guessing_game()
-                else:
-                    print("👋 Farewell, brave adventurer! Until we meet again!")
-                    return
+            if result.outcome == CORRECT:
+                celebrate_victory(quest.attempts, difficulty)
+                return True, quest.attempts
                     
             else:
                 # Provide magical hint
-                hint = get_magical_hint(secret_number, guess, max_num)
-                print(f"🔮 {hint}")
+                print(f"🔮 {result.hint}")
                 
-                if guess < secret_number:
+                if result.outcome == HIGHER:
                     print("📈 The mystical number is higher in the ancient scrolls!")
                 else:
                     print("📉 The mystical number is lower in the ancient scrolls!")
                 
                 # Show remaining attempts
-                remaining = max_attempts - attempts
-                if remaining > 0:
-                    print(f"⚡ {remaining} attempts remaining...")
+                if result.attempts_remaining > 0:
+                    print(f"⚡ {result.attempts_remaining} attempts remaining...")
                 
         except ValueError:
             print("❌ The wizard shakes his head... Please enter a valid number!")
-            attempts -= 1
         except KeyboardInterrupt:
             print("\n\n👋 The quest ends here. Farewell, brave soul!")
             sys.exit(0)
@@ -165,16 +228,60 @@ def play_number_guessing_game():
     print("💀💀💀 QUEST FAILED! 💀💀💀")
     print("="*60)
     print("😢 The mystical number has eluded you!")
-    print(f"🔮 The secret number was {secret_number}...")
+    print(f"🔮 The secret number was {quest.secret_number}...")
     print("🌙 The kingdom remains in peril...")
     print("💪 But do not lose hope! Try again, brave adventurer!")
     
-    # Ask if they want to play again
-    play_again = input("\n🌟 Will you try to save the kingdom again? (y/n): ").lower().strip()
-    if play_again in ['y', 'yes']:
-        return play_number_guessing_game()
+    return False, quest.attempts
+
+def ask_play_again(won, prompt=input):
+    """Offer another quest after a win or a loss."""
+    if won:
+        play_again = prompt("\n🌟 Would you like to embark on another quest? (y/n): ").lower().strip()
+        farewell = "👋 Farewell, brave adventurer! Until we meet again!"
     else:
-        print("👋 May your next adventure be more fortunate!")
+        play_again = prompt("\n🌟 Will you try to save the kingdom again? (y/n): ").lower().strip()
+        farewell = "👋 May your next adventure be more fortunate!"
+    if play_again in ['y', 'yes']:
+        return True
+    print(farewell)
+    return False
+
+def play_number_guessing_game(prompt=input, animate=True, max_games=None):
+    """Main game function for the magical number quest: quests back to back until the player stops."""
+    stats = SessionStats(histogram_size=max(attempts for _, attempts, _ in DIFFICULTIES.values()) + 2)
+    run_session(lambda: play_quest(prompt, animate), lambda won: ask_play_again(won, prompt), stats, max_games)
+    if stats.games > 1:
+        stats.print_summary("attempts")
+    return stats
+
+class ScriptedAdventurer:
+    """Answers the game's prompts for soak runs: random difficulties, guesses (some invalid) and replays."""
+
+    def __init__(self, games, rng):
+        self.quests_left = games
+        self.rng = rng
+
+    def __call__(self, text):
+        if "choice" in text:
+            return str(self.rng.randint(1, 4))
+        if "(y/n)" in text:
+            self.quests_left -= 1
+            return "y" if self.quests_left > 0 else "n"
+        if self.rng.random() < 0.02:
+            return self.rng.choice(["", "abc", "0", "100000"])
+        max_num = int(text.rsplit("-", 1)[1].split(")")[0])
+        return str(self.rng.randint(1, max_num))
 
 if __name__ == "__main__":
-    play_number_guessing_game()
+    parser = argparse.ArgumentParser(description="Magical Number Quest")
+    parser.add_argument("--soak", type=int, metavar="GAMES",
+                        help="play GAMES quests unattended with a scripted player and report session stats")
+    parser.add_argument("--seed", type=int, help="seed for the scripted player and secrets in --soak runs")
+    args = parser.parse_args()
+    if args.soak:
+        random.seed(args.seed)
+        soak(lambda games: play_number_guessing_game(ScriptedAdventurer(games, random.Random(args.seed)),
+                                                     animate=False), args.soak)
+    else:
+        play_number_guessing_game()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+🤖 Batch runner for the Magical Number Quest 🤖
+
+Plays huge numbers of quests with scripted players on the headless
+NumberQuestEngine, spread over a process pool, and reports games per
+second and the outcome distribution as JSON.
+
+    python3 quest_batch.py --games 1000000 --difficulty Adept --player binary
+    python3 quest_batch.py --games 200000 --player random --workers 4
+    python3 quest_batch.py --games 20000 --difficulty legend --player hints
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from number_guessing_game import DIFFICULTIES, HIGHER, LOWER, NumberQuestEngine
+from quest_solver import HintSolverPlayer
+
+
+# ------------------------------ Players ------------------------------
+
+class BinaryPlayer:
+    """Guesses the middle of the range the higher/lower clues leave."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def start(self, max_num, max_attempts):
+        self.lo, self.hi = 1, max_num
+
+    def guess(self):
+        return (self.lo + self.hi) // 2
+
+    def learn(self, guess, result):
+        if result.outcome == HIGHER:
+            self.lo = guess + 1
+        elif result.outcome == LOWER:
+            self.hi = guess - 1
+
+
+class RandomPlayer(BinaryPlayer):
+    """Guesses any number the higher/lower clues still allow."""
+
+    def guess(self):
+        return self.rng.randint(self.lo, self.hi)
+
+
+PLAYERS = {
+    'binary': BinaryPlayer,
+    'random': RandomPlayer,
+    'hints': HintSolverPlayer,
+}
+
+
+# ------------------------------ Runner ------------------------------
+
+def play_games(player_name, max_num, max_attempts, games, seed):
+    """Play ``games`` quests in this process and tally how they ended.
+
+    ``wins_by_attempts[n]`` counts quests won on attempt n.
+    """
+    rng = random.Random(seed)
+    player = PLAYERS[player_name](rng)
+    wins_by_attempts = [0] * (max_attempts + 1)
+    guesses = 0
+    for _ in range(games):
+        quest = NumberQuestEngine(max_num, max_attempts, rng=rng)
+        player.start(max_num, max_attempts)
+        while not quest.over:
+            guess = player.guess()
+            player.learn(guess, quest.guess(guess))
+        guesses += quest.attempts
+        if quest.won:
+            wins_by_attempts[quest.attempts] += 1
+    return {'games': games, 'guesses': guesses, 'wins_by_attempts': wins_by_attempts}
+
+
+def run_batch(player_name, max_num, max_attempts, games, workers, chunk_size, seed=None):
+    """Split ``games`` into chunks with their own seeds and play them on a process pool."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    chunks = [min(chunk_size, games - start) for start in range(0, games, chunk_size)]
+    totals = {'games': 0, 'guesses': 0, 'wins_by_attempts': [0] * (max_attempts + 1)}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, player_name, max_num, max_attempts, count, seed + index)
+                   for index, count in enumerate(chunks)]
+        for future in futures:
+            part = future.result()
+            totals['games'] += part['games']
+            totals['guesses'] += part['guesses']
+            for attempts, count in enumerate(part['wins_by_attempts']):
+                totals['wins_by_attempts'][attempts] += count
+    return totals, seed
+
+
+def summarize(totals, elapsed, config):
+    games = totals['games']
+    wins_by_attempts = totals['wins_by_attempts']
+    won = sum(wins_by_attempts)
+    return {
+        'config': config,
+        'elapsed_sec': round(elapsed, 3),
+        'games_per_sec': round(games / elapsed, 1) if elapsed else 0.0,
+        'games': games,
+        'won': won,
+        'lost': games - won,
+        'win_rate': round(won / games, 6) if games else 0.0,
+        'avg_attempts_when_won': round(sum(n * count for n, count in enumerate(wins_by_attempts)) / won, 4)
+                                 if won else 0.0,
+        'avg_guesses_per_game': round(totals['guesses'] / games, 4) if games else 0.0,
+        'wins_by_attempts': {str(n): count for n, count in enumerate(wins_by_attempts) if n},
+    }
+
+
+def parse_args(argv=None):
+    titles = {title.lower(): (max_num, max_attempts) for max_num, max_attempts, title in DIFFICULTIES.values()}
+    parser = argparse.ArgumentParser(description='Play many Number Quest games with scripted players')
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--difficulty', type=str.lower, choices=sorted(titles), default='adept')
+    parser.add_argument('--player', choices=sorted(PLAYERS), default='binary')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--chunk-size', type=int, default=50_000, help='games per task sent to a worker')
+    parser.add_argument('--seed', type=int, help='base seed for reproducible runs')
+    args = parser.parse_args(argv)
+    args.max_num, args.max_attempts = titles[args.difficulty]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    totals, seed = run_batch(args.player, args.max_num, args.max_attempts, args.games,
+                             args.workers, args.chunk_size, args.seed)
+    config = {'player': args.player, 'difficulty': args.difficulty, 'max_num': args.max_num,
+              'max_attempts': args.max_attempts, 'workers': args.workers, 'seed': seed}
+    print(json.dumps(summarize(totals, time.perf_counter() - started, config), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+🔮 Hint-reading solver for the Magical Number Quest 🔮
+
+Every miss tells the player which temperature band the secret is in
+(within 5%, 10%, 20%, 35%, 50% of the range, or further) and on which
+side of the guess. CandidateSet keeps the numbers still possible as a
+few disjoint intervals, so it works for ranges of any size, and picks
+the guess that leaves the fewest candidates on average.
+
+    python3 quest_solver.py
+    python3 quest_solver.py --max-num 1000000000000
+"""
+
+import argparse
+import random
+import time
+from bisect import bisect_right
+from itertools import accumulate
+
+from number_guessing_game import CORRECT, DIFFICULTIES, HIGHER, LOWER, NumberQuestEngine, hint_distance_limits
+
+
+class CandidateSet:
+    """The numbers the secret can still be, as sorted disjoint (lo, hi) intervals."""
+
+    def __init__(self, max_num):
+        self.max_num = max_num
+        limits = hint_distance_limits(max_num)
+        # (nearest, furthest) distance of every hint band
+        self.bands = list(zip((1,) + tuple(limit + 1 for limit in limits), limits + (max_num,)))
+        self.intervals = [(1, max_num)]
+        self._index()
+
+    def _index(self):
+        self._starts = [lo for lo, _ in self.intervals]
+        self._ends = [hi for _, hi in self.intervals]
+        self._before = [0] + list(accumulate(hi - lo + 1 for lo, hi in self.intervals))
+
+    def __len__(self):
+        return self._before[-1]
+
+    def __contains__(self, number):
+        i = bisect_right(self._starts, number) - 1
+        return i >= 0 and number <= self._ends[i]
+
+    def count(self, lo, hi):
+        """How many candidates lie in lo..hi."""
+        if lo > hi:
+            return 0
+        return self._count_upto(hi) - self._count_upto(lo - 1)
+
+    def _count_upto(self, number):
+        i = bisect_right(self._starts, number)
+        if not i:
+            return 0
+        return self._before[i - 1] + min(number, self._ends[i - 1]) - self._starts[i - 1] + 1
+
+    def narrow(self, guess, band=None, outcome=None):
+        """Keep only the numbers consistent with a miss: its hint band and/or higher/lower clue.
+
+        Runs in O(number of intervals).
+        """
+        near, far = self.bands[band] if band is not None else (1, self.max_num)
+        allowed = []
+        if outcome != HIGHER:
+            allowed.append((guess - far, guess - near))
+        if outcome != LOWER:
+            allowed.append((guess + near, guess + far))
+
+        kept = []
+        i = j = 0
+        while i < len(self.intervals) and j < len(allowed):
+            lo, hi = max(self.intervals[i][0], allowed[j][0]), min(self.intervals[i][1], allowed[j][1])
+            if lo <= hi:
+                kept.append((lo, hi))
+            if self.intervals[i][1] < allowed[j][1]:
+                i += 1
+            else:
+                j += 1
+        self.intervals = kept
+        self._index()
+
+    def learn(self, guess, result):
+        """Apply a GuessResult from NumberQuestEngine."""
+        if result.outcome == CORRECT:
+            self.intervals = [(guess, guess)]
+            self._index()
+        elif result.outcome in (HIGHER, LOWER):
+            self.narrow(guess, result.band, result.outcome)
+
+    def remaining_squares(self, guess):
+        """Sum of squared candidate counts over the outcomes a miss at ``guess`` can give.
+
+        Divided by len(self) this is the expected number of candidates
+        left after the guess, with a hit leaving none.
+        """
+        total = 0
+        for near, far in self.bands:
+            below = self.count(guess - far, guess - near)
+            above = self.count(guess + near, guess + far)
+            total += below * below + above * above
+        return total
+
+    def best_guess(self):
+        """The guess in 1..max_num that leaves the fewest candidates on average.
+
+        Each band's count is piecewise linear in the guess, with corners
+        where a band edge meets an interval end, so between consecutive
+        corners the score is a convex quadratic whose integer minimum
+        three evaluations pin down. That makes the search
+        O((intervals * bands) ** 2 * log intervals) however wide the
+        intervals are.
+        """
+        if len(self) == 1:
+            return self.intervals[0][0]
+        corners = {1, self.max_num + 1}
+        for lo, hi in self.intervals:
+            for near, far in self.bands:
+                for first, last in ((-far, -near), (near, far)):
+                    corners.update((hi - last, lo - first, lo - 1 - last, hi + 1 - first))
+        corners = sorted(corner for corner in corners if 1 <= corner <= self.max_num + 1)
+
+        best = None
+        for start, stop in zip(corners, corners[1:]):
+            options = [start]
+            if stop - start > 2:
+                f0, f1, f2 = (self.remaining_squares(start + t) for t in range(3))
+                curvature = f2 - 2 * f1 + f0
+                if curvature > 0:
+                    t = int(0.5 - (f1 - f0) / curvature)
+                    options += [start + t, start + t + 1]
+                options.append(stop - 1)
+            else:
+                options += range(start + 1, stop)
+            for guess in options:
+                if start <= guess < stop:
+                    score = (self.remaining_squares(guess), guess not in self, guess)
+                    if best is None or score < best:
+                        best = score
+        return best[2]
+
+
+class HintSolverPlayer:
+    """Scripted player that reads the hints through a CandidateSet."""
+
+    def __init__(self, rng=None):
+        self._openings = {}  # the first guess only depends on the range
+
+    def start(self, max_num, max_attempts):
+        self.candidates = CandidateSet(max_num)
+        self.first = True
+
+    def guess(self):
+        if self.first:
+            self.first = False
+            max_num = self.candidates.max_num
+            if max_num not in self._openings:
+                self._openings[max_num] = self.candidates.best_guess()
+            return self._openings[max_num]
+        return self.candidates.best_guess()
+
+    def learn(self, guess, result):
+        self.candidates.learn(guess, result)
+
+
+def attempts_to_find(player, max_num, secret_number):
+    """Attempts ``player`` needs for one secret, ignoring the attempt limit."""
+    quest = NumberQuestEngine(max_num, max_num, secret_number=secret_number)
+    player.start(max_num, max_num)
+    while not quest.won:
+        guess = player.guess()
+        player.learn(guess, quest.guess(guess))
+    return quest.attempts
+
+
+def compare_on_difficulty(max_num, max_attempts):
+    """Average attempts and win rate of binary search vs the hint solver over every secret."""
+    from quest_batch import BinaryPlayer  # quest_batch imports this module for its 'hints' player
+    report = {}
+    for name, player in (('binary search', BinaryPlayer(None)), ('hint solver', HintSolverPlayer())):
+        attempts = [attempts_to_find(player, max_num, secret) for secret in range(1, max_num + 1)]
+        report[name] = (sum(attempts) / max_num, sum(a <= max_attempts for a in attempts) / max_num)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the hint-reading solver with binary search')
+    parser.add_argument('--max-num', type=int, help='time the solver on random secrets in 1..MAX_NUM instead')
+    parser.add_argument('--games', type=int, default=20, help='secrets to play with --max-num')
+    args = parser.parse_args(argv)
+
+    if args.max_num:
+        rng = random.Random(1)
+        player = HintSolverPlayer()
+        started = time.perf_counter()
+        attempts = [attempts_to_find(player, args.max_num, rng.randint(1, args.max_num)) for _ in range(args.games)]
+        elapsed = time.perf_counter() - started
+        print(f"🔮 1-{args.max_num}: {sum(attempts) / len(attempts):.2f} attempts on average "
+              f"(max {max(attempts)}), {elapsed / sum(attempts) * 1000:.2f} ms per guess")
+        return
+
+    for max_num, max_attempts, title in DIFFICULTIES.values():
+        report = compare_on_difficulty(max_num, max_attempts)
+        (binary_avg, binary_win), (hint_avg, hint_win) = report['binary search'], report['hint solver']
+        print(f"🎯 {title} (1-{max_num}, {max_attempts} attempts): binary search {binary_avg:.2f} attempts "
+              f"({binary_win:.1%} wins), hint solver {hint_avg:.2f} ({hint_win:.1%} wins), "
+              f"{binary_avg - hint_avg:.2f} fewer")
+
+
+if __name__ == "__main__":
+    main()
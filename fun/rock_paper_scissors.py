@@ -4,9 +4,15 @@ Rock Paper Scissors Game
 Classic hand game where you play against the computer.
 """
 
+import argparse
 import random
 import sys
 
+from game_session import SessionStats, run_session, soak
+
+# Matches longer than this many rounds (tied rounds included) share the last histogram bucket
+HISTOGRAM_ROUNDS = 10
+
 def get_computer_choice():
     """Get a random choice for the computer."""
     return random.choice(['rock', 'paper', 'scissors'])
@@ -33,8 +39,12 @@ def display_choices(player_choice, computer_choice):
     print(f"\nYou chose: {emoji_map[player_choice]} {player_choice.title()}")
     print(f"Computer chose: {emoji_map[computer_choice]} {computer_choice.title()}")
 
-def play_rock_paper_scissors():
-    """Main game function for Rock Paper Scissors."""
+def play_match(prompt=input, opponent=None):
+    """Play one best-of-3 match and return (player_won, rounds played).
+
+    ``opponent`` is an adaptive computer player (see rps_adaptive); by
+    default the computer picks at random.
+    """
     print("🪨📄✂️ Welcome to Rock Paper Scissors! ✂️📄🪨")
     print("Best of 3 rounds wins the game!")
     print("-" * 40)
@@ -48,7 +58,7 @@ def play_rock_paper_scissors():
         print("Choose: rock, paper, or scissors")
         
         try:
-            player_choice = input("Your choice: ").lower().strip()
+            player_choice = prompt("Your choice: ").lower().strip()
             
             # Validate input
             if player_choice not in ['rock', 'paper', 'scissors']:
@@ -56,7 +66,9 @@ def play_rock_paper_scissors():
                 continue
             
             # Get computer choice
-            computer_choice = get_computer_choice()
+            computer_choice = opponent.choose() if opponent else get_computer_choice()
+            if opponent:
+                opponent.observe(player_choice)
             
             # Display choices
             display_choices(player_choice, computer_choice)
@@ -90,13 +102,57 @@ def play_rock_paper_scissors():
     
     print(f"Final Score - You: {player_score}, Computer: {computer_score}")
     
-    # Ask if they want to play again
-    play_again = input("\nWould you like to play again? (y/n): ").lower().strip()
+    return player_score > computer_score, round_num - 1
+
+def ask_play_again(prompt=input):
+    """Offer another match."""
+    play_again = prompt("\nWould you like to play again? (y/n): ").lower().strip()
     if play_again in ['y', 'yes']:
-        return play_rock_paper_scissors()
-    else:
-        print("Thanks for playing! 👋")
+        return True
+    print("Thanks for playing! 👋")
+    return False
 
-if __name__ == "__main__":
-    play_rock_paper_scissors()
+def play_rock_paper_scissors(prompt=input, max_games=None, opponent=None):
+    """Main game function for Rock Paper Scissors: matches back to back until the player stops."""
+    stats = SessionStats(histogram_size=HISTOGRAM_ROUNDS + 1)
+    run_session(lambda: play_match(prompt, opponent), lambda won: ask_play_again(prompt), stats, max_games)
+    if stats.games > 1:
+        stats.print_summary("rounds")
+    return stats
 
+class ScriptedPlayer:
+    """Answers the game's prompts for soak runs: random throws (some invalid) and replays."""
+
+    def __init__(self, games, rng):
+        self.matches_left = games
+        self.rng = rng
+
+    def __call__(self, text):
+        if "(y/n)" in text:
+            self.matches_left -= 1
+            return "y" if self.matches_left > 0 else "n"
+        if self.rng.random() < 0.02:
+            return "lizard"
+        return self.rng.choice(['rock', 'paper', 'scissors'])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock Paper Scissors")
+    parser.add_argument("--soak", type=int, metavar="GAMES",
+                        help="play GAMES matches unattended with a scripted player and report session stats")
+    parser.add_argument("--seed", type=int, help="seed for the scripted player and computer in --soak runs")
+    parser.add_argument("--adaptive", type=int, nargs="?", const=4, metavar="ORDER",
+                        help="computer learns your patterns from the last ORDER moves (default 4)")
+    args = parser.parse_args()
+    if args.adaptive is not None and args.adaptive < 1:
+        parser.error("--adaptive ORDER must be at least 1")
+    opponent = None
+    if args.adaptive is not None:
+        from rps_adaptive import AdaptiveOpponent
+        opponent = AdaptiveOpponent(max_order=args.adaptive, rng=random.Random(args.seed))
+        print("🧠 The computer is watching your moves...")
+    if args.soak:
+        random.seed(args.seed)
+        soak(lambda games: play_rock_paper_scissors(ScriptedPlayer(games, random.Random(args.seed)),
+                                                     opponent=opponent), args.soak)
+    else:
+        play_rock_paper_scissors(opponent=opponent)
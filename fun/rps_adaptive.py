@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+🧠 Adaptive Rock Paper Scissors opponent 🧠
+
+Predicts the player's next move from what followed the same recent
+moves before, using n-gram counts of every order up to ``max_order``,
+and plays whatever beats it. Counts only cover a sliding window of the
+last ``window`` rounds, so a marathon session uses fixed memory and the
+opponent keeps up when the player changes habits.
+
+    python3 rps_adaptive.py                      # prediction latency and win rates
+    python3 rps_adaptive.py --orders 1 4 8 16 --rounds 200000
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+
+from rock_paper_scissors import determine_winner
+
+MOVES = ('rock', 'paper', 'scissors')
+MOVE_INDEX = {move: index for index, move in enumerate(MOVES)}
+# COUNTER[m] is the move that beats m
+COUNTER = {move: next(other for other in MOVES if determine_winner(other, move) == 'player') for move in MOVES}
+
+DEFAULT_ORDER = 4
+DEFAULT_WINDOW = 500
+
+
+class AdaptiveOpponent:
+    """Computer player that learns the player's move patterns.
+
+    For each order k, ``counts[k - 1]`` maps the last k player moves
+    (packed base 3 into an int) to how often each move came next. Each
+    round adds one event per order and retires the one that slid out of
+    the window, so an update costs O(max_order) whatever the history
+    length; contexts with no events left are dropped, which bounds every
+    table by ``window`` entries.
+    """
+
+    def __init__(self, max_order=DEFAULT_ORDER, window=DEFAULT_WINDOW, rng=None):
+        self.max_order = max_order
+        self.window = window
+        self.rng = rng or random.Random()
+        self.counts = [{} for _ in range(max_order)]
+        self.contexts = [0] * max_order  # packed last-k moves per order
+        self.context_sizes = [3 ** order for order in range(1, max_order + 1)]
+        self.seen = 0  # player moves observed so far
+        self.events = deque()  # (move, contexts it followed) for the rounds in the window
+
+    def predict(self):
+        """The player's most likely next move, from the longest context seen before, or None."""
+        for order in range(min(self.max_order, self.seen), 0, -1):
+            followers = self.counts[order - 1].get(self.contexts[order - 1])
+            if followers:
+                best = max(followers)
+                return MOVES[self.rng.choice([i for i, count in enumerate(followers) if count == best])]
+        return None
+
+    def choose(self):
+        """The computer's move for the next round."""
+        predicted = self.predict()
+        return COUNTER[predicted] if predicted else self.rng.choice(MOVES)
+
+    def observe(self, player_move):
+        """Learn the player's move for the round just played."""
+        move = MOVE_INDEX[player_move]
+        usable = min(self.max_order, self.seen)
+        contexts = tuple(self.contexts[:usable])
+        for order in range(usable):
+            table = self.counts[order]
+            followers = table.get(contexts[order])
+            if followers is None:
+                followers = table[contexts[order]] = [0, 0, 0]
+            followers[move] += 1
+        self.events.append((move, contexts))
+        if len(self.events) > self.window:
+            self._forget(*self.events.popleft())
+
+        for order, size in enumerate(self.context_sizes):
+            self.contexts[order] = (self.contexts[order] * 3 + move) % size
+        self.seen += 1
+
+    def _forget(self, move, contexts):
+        for order, context in enumerate(contexts):
+            table = self.counts[order]
+            followers = table[context]
+            followers[move] -= 1
+            if not any(followers):
+                del table[context]
+
+
+# ------------------------------ Benchmark ------------------------------
+
+def patterned_player(rng, noise=0.1):
+    """A player stuck in a rock, rock, paper, scissors loop who sometimes improvises."""
+    pattern = ('rock', 'rock', 'paper', 'scissors')
+    round_num = 0
+    while True:
+        yield rng.choice(MOVES) if rng.random() < noise else pattern[round_num % len(pattern)]
+        round_num += 1
+
+
+def measure(max_order, window, rounds, seed=1):
+    """Play ``rounds`` rounds against a patterned player and time every predict and observe call."""
+    rng = random.Random(seed)
+    opponent = AdaptiveOpponent(max_order, window, random.Random(seed))
+    player = patterned_player(rng)
+    choose_ns, observe_ns = [], []
+    results = {'player': 0, 'computer': 0, 'tie': 0}
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        computer_move = opponent.choose()
+        choose_ns.append(time.perf_counter_ns() - started)
+        player_move = next(player)
+        started = time.perf_counter_ns()
+        opponent.observe(player_move)
+        observe_ns.append(time.perf_counter_ns() - started)
+        results[determine_winner(player_move, computer_move)] += 1
+    choose_ns.sort()
+    observe_ns.sort()
+    decided = results['player'] + results['computer']
+    return {
+        'order': max_order,
+        'choose_us': (choose_ns[len(choose_ns) // 2] / 1000, choose_ns[int(len(choose_ns) * 0.99)] / 1000),
+        'observe_us': (observe_ns[len(observe_ns) // 2] / 1000, observe_ns[int(len(observe_ns) * 0.99)] / 1000),
+        'computer_win_rate': results['computer'] / decided if decided else 0.0,
+        'contexts': sum(len(table) for table in opponent.counts),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the adaptive Rock Paper Scissors opponent')
+    parser.add_argument('--orders', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--rounds', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    print(f"🧠 {args.rounds} rounds per order against a patterned player (window {args.window})")
+    print(f"   {'order':>5} {'choose p50/p99 µs':>19} {'observe p50/p99 µs':>20} {'computer wins':>14} {'contexts':>9}")
+    for order in args.orders:
+        row = measure(order, args.window, args.rounds)
+        print(f"   {row['order']:>5} {row['choose_us'][0]:>9.2f}/{row['choose_us'][1]:<9.2f}"
+              f" {row['observe_us'][0]:>10.2f}/{row['observe_us'][1]:<9.2f}"
+              f" {row['computer_win_rate']:>13.1%} {row['contexts']:>9}")
+
+
+if __name__ == "__main__":
+    main()
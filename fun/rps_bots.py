@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+🤖 Bot swarm for the Rock Paper Scissors server 🤖
+
+Opens many connections to rps_server.py from one process, each bot
+playing random moves for a number of matches, and reports match
+throughput and round latency as JSON. A share of bots can be told to
+stall mid-match to exercise the server's move timeout.
+
+    python3 rps_bots.py --spawn-server --bots 2000 --matches 5
+    python3 rps_bots.py --port 9000 --bots 200 --stall-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from rps_server import MOVES
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rps_server.py')
+
+
+class SwarmStats:
+    def __init__(self):
+        self.decided = 0  # GAME_OVERs without a forfeit; both bots see one
+        self.outcomes = {'win': 0, 'lose': 0, 'tie': 0}
+        self.forfeits = 0
+        self.timeouts = 0
+        self.match_timeouts = 0  # TIMEOUTs for stalling mid-match
+        self.unpaired = 0
+        self.errors = 0
+        self.round_latencies = []
+
+
+async def bot(host, port, matches, rng, stall, idle_timeout, stats):
+    """Play ``matches`` matches; a stalling bot stops answering in its first match."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.errors += 1
+        return
+    played = 0
+    sent_at = None
+    in_match = False
+    try:
+        while played < matches:
+            try:
+                line = await asyncio.wait_for(reader.readline(), idle_timeout)
+            except asyncio.TimeoutError:
+                stats.unpaired += 1  # nobody left to pair with
+                break
+            if not line:
+                break
+            command, *args = line.decode().split()
+            if command == 'MATCH':
+                in_match = True
+            elif command == 'ROUND':
+                if stall:
+                    continue
+                sent_at = time.perf_counter()
+                writer.write((rng.choice(MOVES) + '\n').encode())
+            elif command == 'RESULT':
+                stats.round_latencies.append(time.perf_counter() - sent_at)
+            elif command == 'GAME_OVER':
+                played += 1
+                in_match = False
+                stats.outcomes[args[0]] += 1
+                if 'forfeit' in args:
+                    stats.forfeits += 1
+                else:
+                    stats.decided += 1
+            elif command == 'TIMEOUT':
+                stats.timeouts += 1
+                stats.match_timeouts += in_match
+                break
+        writer.write(b'QUIT\n')
+    except (ConnectionError, ValueError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def swarm(host, port, bots, matches, stall_rate, idle_timeout, seed):
+    rng = random.Random(seed)
+    stats = SwarmStats()
+    started = time.perf_counter()
+    await asyncio.gather(*(bot(host, port, matches, random.Random(rng.random()), rng.random() < stall_rate,
+                               idle_timeout, stats) for _ in range(bots)))
+    return stats, time.perf_counter() - started
+
+
+def matches_played(stats):
+    """Finished matches, counted from the bots' side.
+
+    Both bots report a decided match, but only the survivor reports a
+    forfeit: the staller gets TIMEOUT instead. A match where both bots
+    stalled reaches no GAME_OVER at all and is not counted; the in-match
+    TIMEOUTs are reported separately.
+    """
+    return stats.decided // 2 + stats.forfeits
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, move_timeout):
+    proc = subprocess.Popen([sys.executable, SERVER_SCRIPT, '--port', str(port), '--move-timeout', str(move_timeout)],
+                            stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f'server did not start listening on port {port}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the Rock Paper Scissors server with bots')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--spawn-server', action='store_true', help='start rps_server.py on a free port first')
+    parser.add_argument('--move-timeout', type=float, default=2.0, help='move timeout for a spawned server')
+    parser.add_argument('--bots', type=int, default=1000)
+    parser.add_argument('--matches', type=int, default=5, help='matches each bot plays')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='share of bots that stop answering')
+    parser.add_argument('--idle-timeout', type=float, default=5.0, help='seconds a bot waits for the server')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    proc = None
+    if args.spawn_server:
+        args.port = free_port()
+        proc = start_server(args.port, args.move_timeout)
+    try:
+        stats, elapsed = asyncio.run(swarm(args.host, args.port, args.bots, args.matches, args.stall_rate,
+                                           args.idle_timeout, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    latencies = sorted(stats.round_latencies)
+    matches = matches_played(stats)
+    print(json.dumps({
+        'bots': args.bots,
+        'elapsed_sec': round(elapsed, 3),
+        'matches': matches,
+        'matches_per_sec': round(matches / elapsed, 1) if elapsed else 0.0,
+        'outcomes': stats.outcomes,
+        'forfeits_seen': stats.forfeits,
+        'timeouts': stats.timeouts,
+        'match_timeouts': stats.match_timeouts,
+        'unpaired': stats.unpaired,
+        'errors': stats.errors,
+        'round_latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+🌐 Rock Paper Scissors matchmaking server 🌐
+
+Players connect over TCP, wait in a lobby and are paired into best-of-3
+matches; both moves of a round are collected at the same time and
+resolved with determine_winner. Everything runs on one asyncio event
+loop, so thousands of matches can be in progress at once.
+
+The protocol is plain text lines, so `nc localhost 9000` is a client:
+
+    server: WAITING                      you are in the lobby
+    server: MATCH <opponent>             a match starts
+    server: ROUND <n>                    send your move...
+    client: rock | paper | scissors      ...within --move-timeout seconds
+    server: RESULT <win|lose|tie> <your move> <their move> <you>-<them>
+    server: GAME_OVER <win|lose|tie> <you>-<them> [forfeit]
+    client: QUIT                         leave (at any time)
+
+After GAME_OVER players go back to the lobby. A player who disconnects
+or misses the move deadline forfeits the match.
+
+    python3 rps_server.py --port 9000
+    python3 rps_bots.py --port 9000 --bots 2000 --matches 5
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from rock_paper_scissors import determine_winner
+
+DEFAULT_PORT = 9000
+MOVES = ('rock', 'paper', 'scissors')
+WINS_NEEDED = 2  # best of 3; ties don't count
+MAX_ROUNDS = 50  # a match still undecided after this many rounds is a tie
+MOVE_TIMEOUT_SEC = 30.0
+LOBBY_TIMEOUT_SEC = 300.0
+LISTEN_BACKLOG = 4096
+MAX_WRITE_BUFFER_BYTES = 64 * 1024  # unread output a client may pile up before it is dropped
+
+
+class Player:
+    """One connection. Lines it sends go out in one write per loop iteration."""
+
+    def __init__(self, player_id, writer):
+        self.id = player_id
+        self.writer = writer
+        self.connected = True
+        self.move = None
+        self.on_move = None  # set while a round waits for this player's move
+        self.lobby_timer = None
+        self._outgoing = []
+
+    def send(self, line):
+        if self.connected:
+            if not self._outgoing:
+                asyncio.get_running_loop().call_soon(self._flush)
+            self._outgoing.append(line)
+
+    def _flush(self):
+        if self.connected and self._outgoing:
+            self.writer.write(('\n'.join(self._outgoing) + '\n').encode())
+            if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_BYTES:
+                # Nothing ever awaits drain(), so a client that sends but never
+                # reads is cut off here instead of growing the buffer forever
+                self.writer.transport.abort()
+                self.close()
+        self._outgoing.clear()
+
+    def receive(self, text):
+        """Handle one line from the client; only moves asked for by a round count."""
+        if self.on_move is None or self.move is not None:
+            return
+        if text in MOVES:
+            self.move = text
+            self.on_move()
+        else:
+            self.send('ERROR choose rock, paper, or scissors')
+
+    def close(self, reason=None):
+        if self.connected:
+            if reason:
+                self.send(reason)
+                self._flush()
+            self.connected = False
+            self.writer.close()
+        if self.on_move is not None:
+            self.on_move()
+
+
+class MatchmakingServer:
+    def __init__(self, move_timeout=MOVE_TIMEOUT_SEC, lobby_timeout=LOBBY_TIMEOUT_SEC):
+        self.move_timeout = move_timeout
+        self.lobby_timeout = lobby_timeout
+        self.waiting = None  # at most one player waits; the next arrival is paired with them
+        self.ids = itertools.count(1)
+        self.matches = set()  # running play_match tasks
+        self.stats = {'connected': 0, 'matches_started': 0, 'matches_finished': 0, 'forfeits': 0, 'active_matches': 0}
+
+    async def handle_connection(self, reader, writer):
+        player = Player(next(self.ids), writer)
+        self.stats['connected'] += 1
+        self.enter_lobby(player)
+        try:
+            while player.connected:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', 'replace').strip().lower()
+                if text == 'quit':
+                    break
+                player.receive(text)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.stats['connected'] -= 1
+            if self.waiting is player:
+                self.waiting = None
+                player.lobby_timer.cancel()
+            player.close()
+
+    def enter_lobby(self, player):
+        opponent, self.waiting = self.waiting, None
+        if opponent is not None and opponent.connected:
+            opponent.lobby_timer.cancel()
+            match = asyncio.ensure_future(self.play_match(opponent, player))
+            self.matches.add(match)
+            match.add_done_callback(self._match_done)
+        else:
+            self.waiting = player
+            player.send('WAITING')
+            player.lobby_timer = asyncio.get_running_loop().call_later(self.lobby_timeout, self._lobby_expired, player)
+
+    def _match_done(self, match):
+        self.matches.discard(match)
+        if not match.cancelled() and match.exception() is not None:
+            match.get_loop().call_exception_handler({
+                'message': 'match failed', 'exception': match.exception(), 'future': match})
+
+    def _lobby_expired(self, player):
+        if self.waiting is player:
+            self.waiting = None
+            player.close('TIMEOUT')
+
+    async def collect_moves(self, first, second):
+        """Wait until both players have moved, either has left, or the move deadline passes.
+
+        Players who are still connected without a move by then time out.
+        """
+        loop = asyncio.get_running_loop()
+        decided = loop.create_future()
+
+        def check():
+            if not decided.done() and (first.move and second.move or not (first.connected and second.connected)):
+                decided.set_result(None)
+
+        for player in (first, second):
+            player.move = None
+            player.on_move = check
+        timer = loop.call_later(self.move_timeout, lambda: decided.done() or decided.set_result(None))
+        try:
+            await decided
+        finally:
+            timer.cancel()
+            first.on_move = second.on_move = None
+        for player in (first, second):
+            if player.connected and player.move is None and (first.connected and second.connected):
+                player.close('TIMEOUT')
+        return first.move if first.connected else None, second.move if second.connected else None
+
+    async def play_match(self, first, second):
+        self.stats['matches_started'] += 1
+        self.stats['active_matches'] += 1
+        scores = {first: 0, second: 0}
+        forfeit = False
+        try:
+            first.send(f'MATCH {second.id}')
+            second.send(f'MATCH {first.id}')
+            for round_num in range(1, MAX_ROUNDS + 1):
+                first.send(f'ROUND {round_num}')
+                second.send(f'ROUND {round_num}')
+                first_move, second_move = await self.collect_moves(first, second)
+                if first_move is None or second_move is None:
+                    forfeit = True
+                    for player in (first, second):
+                        if player.connected:
+                            scores[player] = WINS_NEEDED
+                    break
+                winner = determine_winner(first_move, second_move)
+                if winner == 'player':
+                    scores[first] += 1
+                elif winner == 'computer':
+                    scores[second] += 1
+                first_outcome, second_outcome = {'tie': ('tie', 'tie'), 'player': ('win', 'lose'),
+                                                 'computer': ('lose', 'win')}[winner]
+                first.send(f'RESULT {first_outcome} {first_move} {second_move} {scores[first]}-{scores[second]}')
+                second.send(f'RESULT {second_outcome} {second_move} {first_move} {scores[second]}-{scores[first]}')
+                if max(scores.values()) >= WINS_NEEDED:
+                    break
+        finally:
+            self.stats['active_matches'] -= 1
+            self.stats['matches_finished'] += 1
+            self.stats['forfeits'] += forfeit
+
+        for player, other in ((first, second), (second, first)):
+            if not player.connected:
+                continue
+            if scores[player] == scores[other]:
+                outcome = 'tie'
+            else:
+                outcome = 'win' if scores[player] > scores[other] else 'lose'
+            player.send(f"GAME_OVER {outcome} {scores[player]}-{scores[other]}{' forfeit' if forfeit else ''}")
+            self.enter_lobby(player)
+
+
+async def serve(port, move_timeout, lobby_timeout, report_interval):
+    server = MatchmakingServer(move_timeout, lobby_timeout)
+    listener = await asyncio.start_server(server.handle_connection, '', port, backlog=LISTEN_BACKLOG, reuse_address=True)
+    print(f"🌐 Rock Paper Scissors server listening on port {port}")
+    async with listener:
+        while True:
+            await asyncio.sleep(report_interval)
+            print(' '.join(f'{name}={value}' for name, value in server.stats.items()), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Asyncio matchmaking server for Rock Paper Scissors')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--move-timeout', type=float, default=MOVE_TIMEOUT_SEC,
+                        help='seconds a player has to send a move before forfeiting')
+    parser.add_argument('--lobby-timeout', type=float, default=LOBBY_TIMEOUT_SEC,
+                        help='seconds a player may wait unpaired before being disconnected')
+    parser.add_argument('--report-interval', type=float, default=10.0, help='seconds between stats lines')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.port, args.move_timeout, args.lobby_timeout, args.report_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+🏟️ Rock Paper Scissors tournament engine 🏟️
+
+Pits strategies against each other over millions of best-of-3 matches.
+Moves are small integers and every round is resolved for a whole batch
+of matches at once through a 3x3 payoff table built from
+determine_winner, so results agree with the terminal game exactly.
+
+    python3 rps_tournament.py --matches 5000000 --player beat_last --computer uniform
+    python3 rps_tournament.py --round-robin --matches 200000
+    python3 rps_tournament.py --verify
+"""
+
+import argparse
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from rock_paper_scissors import determine_winner
+
+MOVES = ('rock', 'paper', 'scissors')
+ROCK, PAPER, SCISSORS = range(3)
+WINS_NEEDED = 2  # best of 3; ties don't count
+MAX_ROUNDS = 100  # matches still undecided after this many rounds are scored as ties
+Z_95 = 1.959964
+
+# PAYOFF[player, computer]: 1 player wins the round, 0 tie, -1 computer wins
+PAYOFF = np.array([[{'player': 1, 'tie': 0, 'computer': -1}[determine_winner(player, computer)]
+                    for computer in MOVES] for player in MOVES], dtype=np.int8)
+# BEATS[m] is the move that beats m
+BEATS = np.array([int(np.flatnonzero(PAYOFF[:, move] == 1)[0]) for move in range(3)], dtype=np.int8)
+
+
+# ------------------------------ Strategies ------------------------------
+
+class Strategy(ABC):
+    """Chooses moves for a batch of matches at once.
+
+    ``reset(n)`` starts n matches; ``choose(rng, live)`` returns a move
+    for each live match index; ``observe(live, own, other)`` sees what
+    both sides played there.
+    """
+
+    name = 'strategy'
+
+    def reset(self, n):
+        pass
+
+    @abstractmethod
+    def choose(self, rng, live):
+        """Return a move (0-2) for each index in ``live``, as an int8 array."""
+
+    def observe(self, live, own, other):
+        pass
+
+
+class Uniform(Strategy):
+    """What get_computer_choice does: every move with probability 1/3."""
+
+    name = 'uniform'
+
+    def choose(self, rng, live):
+        return rng.integers(0, 3, size=len(live), dtype=np.int8)
+
+
+class Biased(Strategy):
+    """Favors one move."""
+
+    def __init__(self, probabilities=(0.5, 0.25, 0.25), name='rock_heavy'):
+        self.cumulative = np.cumsum(probabilities) / np.sum(probabilities)
+        self.name = name
+
+    def choose(self, rng, live):
+        return np.searchsorted(self.cumulative, rng.random(len(live)), side='right').astype(np.int8)
+
+
+class Constant(Strategy):
+    def __init__(self, move):
+        self.move = move
+        self.name = f'always_{MOVES[move]}'
+
+    def choose(self, rng, live):
+        return np.full(len(live), self.move, dtype=np.int8)
+
+
+class Cycle(Strategy):
+    """Rock, paper, scissors, rock, ... from a random start."""
+
+    name = 'cycle'
+
+    def reset(self, n):
+        self.next = None
+        self.n = n
+
+    def choose(self, rng, live):
+        if self.next is None:
+            self.next = rng.integers(0, 3, size=self.n, dtype=np.int8)
+        return self.next[live]
+
+    def observe(self, live, own, other):
+        self.next[live] = (own + 1) % 3
+
+
+class BeatLast(Strategy):
+    """Plays what beats the opponent's previous move; random on the first round."""
+
+    name = 'beat_last'
+
+    def reset(self, n):
+        self.last_other = np.full(n, -1, dtype=np.int8)
+
+    def choose(self, rng, live):
+        last = self.last_other[live]
+        moves = rng.integers(0, 3, size=len(live), dtype=np.int8)
+        seen = last >= 0
+        moves[seen] = BEATS[last[seen]]
+        return moves
+
+    def observe(self, live, own, other):
+        self.last_other[live] = other
+
+
+class CopyLast(BeatLast):
+    """Repeats the opponent's previous move; random on the first round."""
+
+    name = 'copy_last'
+
+    def choose(self, rng, live):
+        last = self.last_other[live]
+        moves = rng.integers(0, 3, size=len(live), dtype=np.int8)
+        seen = last >= 0
+        moves[seen] = last[seen]
+        return moves
+
+
+STRATEGIES = {
+    'uniform': Uniform,
+    'rock_heavy': Biased,
+    'always_rock': lambda: Constant(ROCK),
+    'cycle': Cycle,
+    'beat_last': BeatLast,
+    'copy_last': CopyLast,
+}
+
+
+# ------------------------------ Matches ------------------------------
+
+def play_batch(player, computer, n, rng):
+    """Play n best-of-3 matches at once; return (match outcome counts, round outcome counts).
+
+    Both count arrays are indexed by payoff + 1: [computer, tie, player].
+    """
+    player.reset(n)
+    computer.reset(n)
+    player_score = np.zeros(n, dtype=np.int8)
+    computer_score = np.zeros(n, dtype=np.int8)
+    rounds = np.zeros(3, dtype=np.int64)
+    live = np.arange(n)
+    for _ in range(MAX_ROUNDS):
+        if not len(live):
+            break
+        own = player.choose(rng, live)
+        other = computer.choose(rng, live)
+        payoff = PAYOFF[own, other]
+        rounds += np.bincount(payoff + 1, minlength=3)
+        player_score[live] += payoff == 1
+        computer_score[live] += payoff == -1
+        player.observe(live, own, other)
+        computer.observe(live, other, own)
+        going = (player_score[live] < WINS_NEEDED) & (computer_score[live] < WINS_NEEDED)
+        live = live[going]
+
+    matches = np.array([np.count_nonzero(computer_score >= WINS_NEEDED), 0,
+                        np.count_nonzero(player_score >= WINS_NEEDED)], dtype=np.int64)
+    matches[1] = n - matches[0] - matches[2]
+    return matches, rounds
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """95% Wilson score interval for a proportion."""
+    if not trials:
+        return 0.0, 0.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return center - margin, center + margin
+
+
+def rates(counts):
+    total = int(counts.sum())
+    report = {}
+    for label, count in zip(('loss', 'tie', 'win'), counts):
+        low, high = wilson_interval(int(count), total)
+        report[label] = {'rate': round(count / total, 6) if total else 0.0, 'ci95': [round(low, 6), round(high, 6)]}
+    return report
+
+
+def run_tournament(player_name, computer_name, matches, batch_size=1_000_000, seed=None):
+    """Play ``matches`` matches in batches and report win/tie/loss rates for the player side."""
+    rng = np.random.default_rng(seed)
+    player, computer = STRATEGIES[player_name](), STRATEGIES[computer_name]()
+    match_counts = np.zeros(3, dtype=np.int64)
+    round_counts = np.zeros(3, dtype=np.int64)
+    started = time.perf_counter()
+    for start in range(0, matches, batch_size):
+        batch_matches, batch_rounds = play_batch(player, computer, min(batch_size, matches - start), rng)
+        match_counts += batch_matches
+        round_counts += batch_rounds
+    elapsed = time.perf_counter() - started
+    return {
+        'player': player_name,
+        'computer': computer_name,
+        'matches': matches,
+        'elapsed_sec': round(elapsed, 3),
+        'matches_per_sec': round(matches / elapsed, 1) if elapsed else 0.0,
+        'match': rates(match_counts),
+        'round': rates(round_counts),
+    }
+
+
+def verify(samples=100_000, seed=0):
+    """Replay random rounds through determine_winner and compare with the payoff table.
+
+    Raises ValueError on the first disagreement; returns how many rounds agreed.
+    """
+    outcome = {'player': 1, 'tie': 0, 'computer': -1}
+    rng = np.random.default_rng(seed)
+    own, other = rng.integers(0, 3, samples), rng.integers(0, 3, samples)
+    for a, b, payoff in zip(own.tolist(), other.tolist(), PAYOFF[own, other].tolist()):
+        if payoff != outcome[determine_winner(MOVES[a], MOVES[b])]:
+            raise ValueError(f"payoff table disagrees with determine_winner on {MOVES[a]} vs {MOVES[b]}")
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Vectorized Rock Paper Scissors tournaments')
+    parser.add_argument('--player', choices=sorted(STRATEGIES), default='beat_last')
+    parser.add_argument('--computer', choices=sorted(STRATEGIES), default='uniform')
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=1_000_000, help='matches simulated per vectorized batch')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--round-robin', action='store_true', help='play every strategy against every other')
+    parser.add_argument('--verify', action='store_true', help='check the payoff table against determine_winner')
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        print(f"✅ payoff table matches determine_winner on {verify()} random rounds")
+        return
+    if args.round_robin:
+        report = [run_tournament(player, computer, args.matches, args.batch_size, args.seed)
+                  for player in STRATEGIES for computer in STRATEGIES if player < computer]
+    else:
+        report = run_tournament(args.player, args.computer, args.matches, args.batch_size, args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
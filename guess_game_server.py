@@ -1,25 +1,1073 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import hmac
 import http.server
 import socketserver
 import json
+import math
+import mmap
+import multiprocessing
+import os
 import random
-from urllib.parse import urlparse, parse_qs
+import secrets
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
 
-# Global game state
-game_state = {
-    'target_number': random.randint(1, 100),
-    'attempts': 0
-}
+# Session settings
+SESSION_COOKIE = 'guess_session'
+SESSION_SHARDS = 64
+SESSION_TTL_SEC = 30 * 60
+SESSION_MAX = 500_000
+SHARED_SESSION_WAYS = 8
+SHARED_SESSION_LOCKS = 64
+# How often the pre-fork housekeeper clears expired shared-table slots
+SESSION_SWEEP_INTERVAL_SEC = 60
+# Session ids are bearer tokens, so snapshots live in a private directory
+# outside the working tree (the temp dir is already per-user on Windows)
+DATA_DIR = os.path.join(tempfile.gettempdir(), f'guess_game-{os.getuid()}' if hasattr(os, 'getuid') else 'guess_game')
+SNAPSHOT_PATH = os.path.join(DATA_DIR, 'sessions.snap')
+SNAPSHOT_INTERVAL_SEC = 30
 
-class GuessGameHandler(http.server.SimpleHTTPRequestHandler):
-    
-    def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            html = """
+# Serving settings
+DEFAULT_PORT = 8000
+DEFAULT_THREADS = 256
+KEEPALIVE_TIMEOUT_SEC = 15
+LISTEN_BACKLOG = 1024
+INDEX_CACHE_CONTROL = 'public, max-age=300'
+
+# Batch guess settings
+MAX_BATCH_GUESSES = 4096
+MAX_BODY_BYTES = 64 * 1024
+
+# Leaderboard settings
+LEADERBOARD_PATH = 'leaderboard.log'
+LEADERBOARD_CAPACITY = 1000
+LEADERBOARD_COMMIT_WINDOW_SEC = 0.005
+LEADERBOARD_COMPACT_FACTOR = 4
+# Wins the pre-fork ring holds while the housekeeper catches up (or restarts)
+LEADERBOARD_RING_SLOTS = 4096
+# Keys the public player tags; fresh per run, shared with forked workers
+PLAYER_TAG_KEY = secrets.token_bytes(16)
+
+# Metrics settings
+LATENCY_BUCKETS_SEC = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+METRIC_ROUTES = frozenset(('/', '/guess', '/guess/batch', '/newgame', '/leaderboard', '/stats', '/metrics', '/ws'))
+
+# WebSocket settings
+WS_PATH = '/ws'
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+WS_MAX_FRAME_BYTES = 1024
+WS_IDLE_TIMEOUT_SEC = 10 * 60
+
+# Admission control settings
+RATE_LIMIT_PER_SEC = 50.0
+RATE_LIMIT_BURST = 100
+RATE_LIMIT_CLIENTS = 100_000
+RATE_LIMIT_SHARDS = 16
+MAX_INFLIGHT = 512
+MAX_CONNECTIONS = 50_000
+OVERLOADED_RESPONSE = (b'HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n'
+                       b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+
+# Access log settings
+ACCESS_LOG_QUEUE = 65536
+ACCESS_LOG_FLUSH_SEC = 0.25
+ACCESS_LOG_MAX_BYTES = 64 * 1024 * 1024
+ACCESS_LOG_BACKUPS = 5
+
+
+def new_game_entry():
+    """Return a fresh per-player game state."""
+    return {
+        'target_number': random.randint(1, 100),
+        'attempts': 0,
+        'won': False,
+        'last_seen': time.monotonic()
+    }
+
+
+# key, last_seen, target_number, attempts, won
+SESSION_RECORD = struct.Struct('<16sdIIB7x')
+_EMPTY_KEY = bytes(16)
+
+
+def session_key(session_id):
+    """Return the 16 raw bytes behind a hex session id, or None if malformed."""
+    try:
+        key = bytes.fromhex(session_id)
+    except (TypeError, ValueError):
+        return None
+    return key if len(key) == 16 else None
+
+
+def restore_session(store, session_id):
+    """Pull a session the store does not hold out of its snapshot, if any."""
+    if store.fallback is None:
+        return None
+    record = store.fallback.lookup(session_id)
+    if record is None:
+        return None
+    last_seen_wall, target, attempts, won = record
+    if time.time() - last_seen_wall >= store.ttl:
+        return None
+    entry = {'target_number': target, 'attempts': attempts, 'won': bool(won), 'last_seen': time.monotonic()}
+    store.save(session_id, entry)
+    return entry
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries', 'evictions')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Least recently used first, so the eviction candidate is always at the front
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+
+class SessionStore:
+    """Per-player game state, split into lock-striped shards.
+
+    Each shard is an OrderedDict kept in least-recently-used order, so a
+    lookup, a touch and an eviction are all O(1). Sessions idle for longer
+    than ``ttl`` seconds, or pushed out when a shard exceeds its share of
+    ``max_sessions``, are dropped and counted in ``evictions``.
+    """
+
+    def __init__(self, shards=SESSION_SHARDS, ttl=SESSION_TTL_SEC, max_sessions=SESSION_MAX):
+        self.ttl = ttl
+        # SessionSnapshot consulted on a miss, so a restart resumes old games
+        self.fallback = None
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_cap = max(1, max_sessions // shards)
+
+    def _shard(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _expire(self, shard, now):
+        entries = shard.entries
+        while entries:
+            oldest = next(iter(entries.values()))
+            if len(entries) <= self._shard_cap and now - oldest['last_seen'] < self.ttl:
+                break
+            entries.popitem(last=False)
+            shard.evictions += 1
+
+    def get(self, session_id):
+        """Return the live entry for ``session_id`` or None if unknown or expired."""
+        shard = self._shard(session_id)
+        now = time.monotonic()
+        with shard.lock:
+            self._expire(shard, now)
+            entry = shard.entries.get(session_id)
+            if entry is not None:
+                entry['last_seen'] = now
+                shard.entries.move_to_end(session_id)
+                return entry
+        return restore_session(self, session_id)
+
+    def create(self):
+        """Start a new session and return ``(session_id, entry)``."""
+        session_id = secrets.token_hex(16)
+        entry = new_game_entry()
+        shard = self._shard(session_id)
+        with shard.lock:
+            shard.entries[session_id] = entry
+            self._expire(shard, entry['last_seen'])
+        return session_id, entry
+
+    def save(self, session_id, entry):
+        """Write ``entry`` back after it has been modified."""
+        shard = self._shard(session_id)
+        with shard.lock:
+            entry['last_seen'] = time.monotonic()
+            shard.entries[session_id] = entry
+            shard.entries.move_to_end(session_id)
+
+    def snapshot_records(self):
+        """Yield ``(key, last_seen_wall, target, attempts, won)`` per session.
+
+        Each shard is copied under its lock and converted outside it.
+        """
+        to_wall = time.time() - time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                items = list(shard.entries.items())
+            for session_id, entry in items:
+                key = session_key(session_id)
+                if key is not None:
+                    yield key, entry['last_seen'] + to_wall, entry['target_number'], entry['attempts'], entry['won']
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    @property
+    def evictions(self):
+        return sum(shard.evictions for shard in self._shards)
+
+    def stats(self):
+        return {
+            'live_sessions': len(self),
+            'evictions': self.evictions,
+            'shards': len(self._shards)
+        }
+
+
+class SharedLock:
+    """Process-shared lock that remembers the pid holding it.
+
+    A worker killed inside a critical section would otherwise leave the
+    lock taken for good; the supervisor calls ``release_if_held_by`` with
+    the pid of every child it reaps.
+    """
+
+    def __init__(self):
+        self._lock = multiprocessing.Lock()
+        self._owner = multiprocessing.RawValue('q', 0)
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._owner.value = os.getpid()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._owner.value = 0
+        self._lock.release()
+
+    def release_if_held_by(self, pid):
+        if self._owner.value == pid:
+            self._owner.value = 0
+            self._lock.release()
+
+
+class SharedSessionTable:
+    """Session table in anonymous shared memory, for pre-forked workers.
+
+    Same interface as SessionStore. Records live in a set-associative table:
+    a session id hashes to one bucket of ``ways`` fixed-size slots, and a
+    new session takes a free or expired slot in its bucket, else the least
+    recently used one. Buckets are guarded by a striped set of
+    process-shared locks, so every operation is O(ways) with no probing
+    and no resizing. Expired slots are cleared on lookup and by ``sweep``.
+    Must be created before the workers fork.
+    """
+
+    def __init__(self, capacity=SESSION_MAX, ttl=SESSION_TTL_SEC, ways=SHARED_SESSION_WAYS, locks=SHARED_SESSION_LOCKS):
+        self.ttl = ttl
+        self.ways = ways
+        self.buckets = max(1, capacity // ways)
+        self.fallback = None
+        self._locks = [SharedLock() for _ in range(locks)]
+        # Per-lock live/eviction counters, updated under that lock
+        self._counters = struct.Struct(f'<{2 * locks}q')
+        self._records_at = self._counters.size
+        self._mem = mmap.mmap(-1, self._records_at + self.buckets * ways * SESSION_RECORD.size)
+
+    def _locate(self, session_id):
+        key = session_key(session_id)
+        if key is None:
+            return None, 0
+        return key, int.from_bytes(key[:8], 'little') % self.buckets
+
+    def _slots(self, bucket):
+        start = self._records_at + bucket * self.ways * SESSION_RECORD.size
+        return range(start, start + self.ways * SESSION_RECORD.size, SESSION_RECORD.size)
+
+    def _count(self, stripe, live=0, evicted=0):
+        offset = 16 * stripe
+        current_live, current_evicted = struct.unpack_from('<2q', self._mem, offset)
+        struct.pack_into('<2q', self._mem, offset, current_live + live, current_evicted + evicted)
+
+    def _lock(self, bucket):
+        stripe = bucket % len(self._locks)
+        return stripe, self._locks[stripe]
+
+    def get(self, session_id):
+        key, bucket = self._locate(session_id)
+        if key is None:
+            return None
+        now = time.monotonic()
+        stripe, lock = self._lock(bucket)
+        with lock:
+            for offset in self._slots(bucket):
+                slot_key, last_seen, target, attempts, won = SESSION_RECORD.unpack_from(self._mem, offset)
+                if slot_key != key:
+                    continue
+                if now - last_seen >= self.ttl:
+                    SESSION_RECORD.pack_into(self._mem, offset, _EMPTY_KEY, 0.0, 0, 0, 0)
+                    self._count(stripe, live=-1, evicted=1)
+                    return None
+                SESSION_RECORD.pack_into(self._mem, offset, key, now, target, attempts, won)
+                return {'target_number': target, 'attempts': attempts, 'won': bool(won), 'last_seen': now}
+        return restore_session(self, session_id)
+
+    def create(self):
+        session_id = secrets.token_hex(16)
+        entry = new_game_entry()
+        self.save(session_id, entry)
+        return session_id, entry
+
+    def save(self, session_id, entry):
+        key, bucket = self._locate(session_id)
+        if key is None:
+            return
+        now = time.monotonic()
+        entry['last_seen'] = now
+        record = (key, now, entry['target_number'], entry['attempts'], entry['won'])
+        stripe, lock = self._lock(bucket)
+        with lock:
+            free, oldest, oldest_seen = None, None, None
+            for offset in self._slots(bucket):
+                slot_key, last_seen = struct.unpack_from('<16sd', self._mem, offset)
+                if slot_key == key:
+                    SESSION_RECORD.pack_into(self._mem, offset, *record)
+                    return
+                if slot_key == _EMPTY_KEY:
+                    if free is None:
+                        free = offset
+                elif oldest is None or last_seen < oldest_seen:
+                    oldest, oldest_seen = offset, last_seen
+            if free is not None:
+                SESSION_RECORD.pack_into(self._mem, free, *record)
+                self._count(stripe, live=1)
+            else:
+                # Bucket full: the least recently used session makes room
+                SESSION_RECORD.pack_into(self._mem, oldest, *record)
+                self._count(stripe, evicted=1)
+
+    def snapshot_records(self):
+        """Yield ``(key, last_seen_wall, target, attempts, won)`` per session,
+        copying one bucket at a time under its lock."""
+        to_wall = time.time() - time.monotonic()
+        bucket_bytes = self.ways * SESSION_RECORD.size
+        for bucket in range(self.buckets):
+            start = self._records_at + bucket * bucket_bytes
+            with self._lock(bucket)[1]:
+                data = self._mem[start:start + bucket_bytes]
+            for key, last_seen, target, attempts, won in SESSION_RECORD.iter_unpack(data):
+                if key != _EMPTY_KEY:
+                    yield key, last_seen + to_wall, target, attempts, won
+
+    def sweep(self):
+        """Clear expired slots, one bucket at a time, so idle sessions that
+        are never looked up again stop counting as live."""
+        for bucket in range(self.buckets):
+            now = time.monotonic()
+            stripe, lock = self._lock(bucket)
+            with lock:
+                for offset in self._slots(bucket):
+                    slot_key, last_seen = struct.unpack_from('<16sd', self._mem, offset)
+                    if slot_key != _EMPTY_KEY and now - last_seen >= self.ttl:
+                        SESSION_RECORD.pack_into(self._mem, offset, _EMPTY_KEY, 0.0, 0, 0, 0)
+                        self._count(stripe, live=-1, evicted=1)
+
+    def release_locks(self, pid):
+        for lock in self._locks:
+            lock.release_if_held_by(pid)
+
+    def _totals(self):
+        values = self._counters.unpack_from(self._mem, 0)
+        return sum(values[0::2]), sum(values[1::2])
+
+    def __len__(self):
+        return self._totals()[0]
+
+    @property
+    def evictions(self):
+        return self._totals()[1]
+
+    def stats(self):
+        live, evictions = self._totals()
+        return {
+            'live_sessions': live,
+            'evictions': evictions,
+            'buckets': self.buckets,
+            'ways': self.ways
+        }
+
+
+# magic, sessions, buckets, ways, written_at
+SNAPSHOT_HEADER = struct.Struct('<8sQQQd')
+SNAPSHOT_MAGIC = b'GGSNAP01'
+
+
+class SessionSnapshot:
+    """Read-only view of a session snapshot file through ``mmap``.
+
+    The file is a hash table of SESSION_RECORD slots (last_seen holds wall
+    time), ``ways`` slots per bucket, with overflow spilling into the next
+    bucket. Opening it only maps the file and reads the header; records are
+    looked up in place, so startup cost does not grow with session count.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mem = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.sessions, self.buckets, self.ways, self.written_at = SNAPSHOT_HEADER.unpack_from(self._mem, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f'{path} is not a session snapshot')
+
+    @classmethod
+    def open(cls, path):
+        """Return the snapshot at ``path``, or None if there is no usable one."""
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def lookup(self, session_id):
+        """Return ``(last_seen_wall, target, attempts, won)`` or None."""
+        key = session_key(session_id)
+        if key is None:
+            return None
+        bucket = int.from_bytes(key[:8], 'little') % self.buckets
+        for _ in range(self.buckets):
+            start = SNAPSHOT_HEADER.size + bucket * self.ways * SESSION_RECORD.size
+            for offset in range(start, start + self.ways * SESSION_RECORD.size, SESSION_RECORD.size):
+                slot_key, last_seen, target, attempts, won = SESSION_RECORD.unpack_from(self._mem, offset)
+                if slot_key == key:
+                    return last_seen, target, attempts, won
+                if slot_key == _EMPTY_KEY:
+                    return None
+            bucket = (bucket + 1) % self.buckets
+        return None
+
+    def records(self):
+        data = memoryview(self._mem)[SNAPSHOT_HEADER.size:]
+        for record in SESSION_RECORD.iter_unpack(data):
+            if record[0] != _EMPTY_KEY:
+                yield record
+
+
+def _private_opener(path, flags):
+    return os.open(path, flags, 0o600)
+
+
+def _exclusive_opener(path, flags):
+    # Never write through a symlink or into a file someone else planted
+    return os.open(path, flags | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+
+
+def ensure_private_dir(path):
+    """Create ``path`` as a 0700 directory, or refuse one that is not ours alone.
+
+    The default data dir has a predictable name in a shared temp dir, so
+    another user could create it (or a symlink) first.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f'{path} is not a directory; refusing to keep session data there')
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700):
+        raise PermissionError(f'{path} must be owned by this user with mode 0700; refusing to keep session data there')
+
+
+def write_session_snapshot(path, records, ways=SHARED_SESSION_WAYS):
+    """Write ``{key: (last_seen_wall, target, attempts, won)}`` as a snapshot.
+
+    The table is sized at half load and built in a plain Python loop,
+    which keeps yielding the GIL to request threads. The new file replaces
+    the old one atomically, so a reader never sees a half-written snapshot.
+    """
+    buckets = len(records) * 2 // ways + 1
+    data = bytearray(SNAPSHOT_HEADER.size + buckets * ways * SESSION_RECORD.size)
+    SNAPSHOT_HEADER.pack_into(data, 0, SNAPSHOT_MAGIC, len(records), buckets, ways, time.time())
+    used = bytearray(buckets)
+    for key, (last_seen, target, attempts, won) in records.items():
+        bucket = int.from_bytes(key[:8], 'little') % buckets
+        while used[bucket] == ways:
+            bucket = (bucket + 1) % buckets
+        offset = SNAPSHOT_HEADER.size + (bucket * ways + used[bucket]) * SESSION_RECORD.size
+        SESSION_RECORD.pack_into(data, offset, key, last_seen, target, attempts, won)
+        used[bucket] += 1
+    tmp_path = path + '.tmp'
+    try:
+        os.unlink(tmp_path)  # left over from a crash mid-write
+    except FileNotFoundError:
+        pass
+    with open(tmp_path, 'wb', opener=_exclusive_opener) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SessionSnapshotter:
+    """Periodically snapshots a session store and restores it on restart.
+
+    ``attach`` maps the last snapshot as the store's fallback, so sessions
+    come back lazily on first use. Each snapshot merges the store's live
+    sessions with unexpired ones still only in the previous snapshot,
+    writes a new file beside it and swaps the fallback over to it.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, interval=SNAPSHOT_INTERVAL_SEC):
+        self.path = path
+        directory = os.path.dirname(path) or '.'
+        if os.path.abspath(directory) == os.path.abspath(DATA_DIR):
+            ensure_private_dir(directory)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.interval = interval
+        self.snapshots = 0
+        self.last_duration = 0.0
+        self._store = None
+        self._lock = threading.Lock()
+
+    def attach(self, store):
+        self._store = store
+        store.fallback = SessionSnapshot.open(self.path)
+        return store.fallback
+
+    def start(self):
+        threading.Thread(target=self._snapshot_loop, name='session-snapshot', daemon=True).start()
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.snapshot()
+
+    def snapshot(self):
+        with self._lock:
+            started = time.perf_counter()
+            store = self._store
+            records = {key: (last_seen, target, attempts, won)
+                       for key, last_seen, target, attempts, won in store.snapshot_records()}
+            previous = store.fallback
+            if previous is not None:
+                oldest = time.time() - store.ttl
+                for key, last_seen, target, attempts, won in previous.records():
+                    if key not in records and last_seen > oldest:
+                        records[key] = (last_seen, target, attempts, won)
+            write_session_snapshot(self.path, records)
+            # The old mapping is left to the garbage collector so lookups
+            # already running against it finish safely.
+            store.fallback = SessionSnapshot.open(self.path)
+            self.snapshots += 1
+            self.last_duration = time.perf_counter() - started
+
+
+def session_id_from_cookie(cookie_header):
+    """Pull the session id out of a Cookie header without a full cookie parse."""
+    if not cookie_header:
+        return None
+    for part in cookie_header.split(';'):
+        name, _, value = part.strip().partition('=')
+        if name == SESSION_COOKIE and value:
+            return value
+    return None
+
+
+class Leaderboard:
+    """Completed games, persisted to an append-only log and ranked in memory.
+
+    ``record`` inserts into the in-memory ranking and queues the entry for
+    a background committer, which writes whatever has queued up during the
+    previous fsync as one group commit. At startup the log is replayed into
+    the ranking; once the log holds ``compact_factor`` times more records
+    than the ranking keeps, it is rewritten with just the ranked entries so
+    replay time stays flat.
+    """
+
+    def __init__(self, path=LEADERBOARD_PATH, capacity=LEADERBOARD_CAPACITY,
+                 commit_window=LEADERBOARD_COMMIT_WINDOW_SEC, compact_factor=LEADERBOARD_COMPACT_FACTOR):
+        self.path = path
+        self.capacity = capacity
+        self.commit_window = commit_window
+        self.compact_factor = compact_factor
+        self.commits = 0
+        self.compactions = 0
+        # (attempts, finished_at, seq, player), best first
+        self._ranking = []
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_ready = threading.Condition(threading.Lock())
+        self._committed = threading.Condition(self._lock)
+        self._seq = 0
+        self._committed_seq = 0
+
+        self._log_records = self._replay()
+        self._log = open(self.path, 'ab')
+        if self._log_records > self.capacity * self.compact_factor:
+            self._compact()
+        threading.Thread(target=self._commit_loop, name='leaderboard-commit', daemon=True).start()
+
+    def _replay(self):
+        """Load the log into the ranking and cut off a torn write at its tail."""
+        records = 0
+        try:
+            log = open(self.path, 'rb')
+        except FileNotFoundError:
+            return 0
+        offset = good_end = 0
+        with log:
+            for line in log:
+                offset += len(line)
+                if not line.endswith(b'\n'):
+                    continue  # torn write at the tail of the log
+                try:
+                    entry = json.loads(line)
+                    attempts, finished_at, player = entry['attempts'], entry['finished_at'], entry['player']
+                except (ValueError, KeyError):
+                    continue
+                good_end = offset
+                records += 1
+                self._seq += 1
+                self._insert((attempts, finished_at, self._seq, player))
+        if good_end < offset:
+            # Otherwise the next append would be glued onto the partial line
+            os.truncate(self.path, good_end)
+        self._committed_seq = self._seq
+        return records
+
+    def _insert(self, entry):
+        ranking = self._ranking
+        if len(ranking) >= self.capacity and entry >= ranking[-1]:
+            return
+        insort(ranking, entry)
+        if len(ranking) > self.capacity:
+            ranking.pop()
+
+    def record(self, player, attempts):
+        with self._lock:
+            self._seq += 1
+            entry = (attempts, time.time(), self._seq, player)
+            self._insert(entry)
+            # Queue under the same lock so batches stay in seq order and
+            # _committed_seq never runs ahead of an unwritten entry
+            with self._pending_ready:
+                self._pending.append(entry)
+                self._pending_ready.notify()
+
+    def flush(self, timeout=None):
+        """Wait until every game recorded so far is in the log; False on timeout."""
+        with self._committed:
+            return self._committed.wait_for(lambda: self._committed_seq >= self._seq, timeout)
+
+    def top(self, n):
+        """Return the best ``n`` games; O(n), never touches disk."""
+        with self._lock:
+            best = self._ranking[:n]
+        return [{'player': player, 'attempts': attempts, 'finished_at': finished_at}
+                for attempts, finished_at, _, player in best]
+
+    def _commit_loop(self):
+        while True:
+            with self._pending_ready:
+                while not self._pending:
+                    self._pending_ready.wait()
+            # Let a burst of wins pile up so it shares one fsync
+            time.sleep(self.commit_window)
+            with self._pending_ready:
+                batch, self._pending = self._pending, []
+            self._log.write(b''.join(
+                json.dumps({'player': player, 'attempts': attempts, 'finished_at': finished_at}).encode() + b'\n'
+                for attempts, finished_at, _, player in batch))
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self.commits += 1
+            with self._lock:
+                self._committed_seq = batch[-1][2]
+                self._committed.notify_all()
+            self._log_records += len(batch)
+            if self._log_records > self.capacity * self.compact_factor:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the log with only the ranked, already committed entries."""
+        with self._lock:
+            keep = [entry for entry in self._ranking if entry[2] <= self._committed_seq]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as tmp:
+            for attempts, finished_at, _, player in sorted(keep, key=lambda entry: entry[2]):
+                tmp.write(json.dumps({'player': player, 'attempts': attempts, 'finished_at': finished_at}).encode() + b'\n')
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        self._log.close()
+        os.replace(tmp_path, self.path)
+        self._log = open(self.path, 'ab')
+        self._log_records = len(keep)
+        self.compactions += 1
+
+    def stats(self):
+        return {
+            'ranked': len(self._ranking),
+            'log_records': self._log_records,
+            'commits': self.commits,
+            'compactions': self.compactions
+        }
+
+
+# attempts, finished_at, player
+LEADERBOARD_RECORD = struct.Struct('<Id8s')
+# ranked, log_records, commits, compactions
+LEADERBOARD_HEADER = struct.Struct('<4q')
+# Pre-fork win ring: head, tail, dropped; then (attempts, player) slots
+WIN_RING_HEADER = struct.Struct('<3q')
+WIN_RECORD = struct.Struct('<I8s')
+
+
+class SharedLeaderboard:
+    """Leaderboard front end for pre-forked workers.
+
+    Workers queue wins to the housekeeper, which owns the real Leaderboard
+    and its log, and read the ranking from a fixed-record copy in shared
+    memory that the housekeeper republishes once each burst of wins is
+    committed.
+
+    Wins travel through a ring in shared memory guarded by a SharedLock,
+    with a semaphore only as a wake-up count, so a child killed anywhere
+    in ``record`` or ``pump`` leaves nothing the supervisor cannot free.
+    When the ring is full (the housekeeper is down) new wins are dropped
+    and counted rather than blocking the worker.
+    """
+
+    def __init__(self, capacity=LEADERBOARD_CAPACITY, ring_slots=LEADERBOARD_RING_SLOTS):
+        self.capacity = capacity
+        self.ring_slots = ring_slots
+        self._lock = SharedLock()
+        self._mem = mmap.mmap(-1, LEADERBOARD_HEADER.size + capacity * LEADERBOARD_RECORD.size)
+        self._ring_lock = SharedLock()
+        self._ring = mmap.mmap(-1, WIN_RING_HEADER.size + ring_slots * WIN_RECORD.size)
+        self._ready = multiprocessing.Semaphore(0)
+
+    def record(self, player, attempts):
+        with self._ring_lock:
+            head, tail, dropped = WIN_RING_HEADER.unpack_from(self._ring, 0)
+            if head - tail >= self.ring_slots:
+                WIN_RING_HEADER.pack_into(self._ring, 0, head, tail, dropped + 1)
+                return
+            WIN_RECORD.pack_into(self._ring, WIN_RING_HEADER.size + head % self.ring_slots * WIN_RECORD.size,
+                                 attempts, player.encode())
+            WIN_RING_HEADER.pack_into(self._ring, 0, head + 1, tail, dropped)
+        self._ready.release()
+
+    def _take_wins(self):
+        """Remove and return every queued ``(player, attempts)``."""
+        wins = []
+        with self._ring_lock:
+            head, tail, dropped = WIN_RING_HEADER.unpack_from(self._ring, 0)
+            for seq in range(tail, head):
+                attempts, player = WIN_RECORD.unpack_from(
+                    self._ring, WIN_RING_HEADER.size + seq % self.ring_slots * WIN_RECORD.size)
+                wins.append((player.decode(), attempts))
+            WIN_RING_HEADER.pack_into(self._ring, 0, head, head, dropped)
+        return wins
+
+    @property
+    def dropped(self):
+        return WIN_RING_HEADER.unpack_from(self._ring, 0)[2]
+
+    def top(self, n):
+        size = LEADERBOARD_RECORD.size
+        with self._lock:
+            ranked = LEADERBOARD_HEADER.unpack_from(self._mem, 0)[0]
+            data = self._mem[LEADERBOARD_HEADER.size:LEADERBOARD_HEADER.size + min(n, ranked) * size]
+        return [{'player': player.decode(), 'attempts': attempts, 'finished_at': finished_at}
+                for attempts, finished_at, player in LEADERBOARD_RECORD.iter_unpack(data)]
+
+    def stats(self):
+        with self._lock:
+            ranked, log_records, commits, compactions = LEADERBOARD_HEADER.unpack_from(self._mem, 0)
+        return {'ranked': ranked, 'log_records': log_records, 'commits': commits, 'compactions': compactions,
+                'dropped_wins': self.dropped}
+
+    def release_locks(self, pid):
+        self._lock.release_if_held_by(pid)
+        self._ring_lock.release_if_held_by(pid)
+
+    def pump(self, board):
+        """Housekeeper side: feed queued wins into ``board`` and publish it. Never returns."""
+        while True:
+            # Drain before waiting: a restarted housekeeper picks up wins
+            # its predecessor was signalled about but never took
+            for player, attempts in self._take_wins():
+                board.record(player, attempts)
+            # Publish the commit counters only once the burst is on disk
+            board.flush()
+            ranking = board.top(self.capacity)
+            stats = board.stats()
+            data = b''.join(LEADERBOARD_RECORD.pack(entry['attempts'], entry['finished_at'], entry['player'].encode())
+                            for entry in ranking)
+            with self._lock:
+                LEADERBOARD_HEADER.pack_into(self._mem, 0, len(ranking), stats['log_records'],
+                                             stats['commits'], stats['compactions'])
+                self._mem[LEADERBOARD_HEADER.size:LEADERBOARD_HEADER.size + len(data)] = data
+            self._ready.acquire()
+            # One pass handles every win signalled so far
+            while self._ready.acquire(False):
+                pass
+
+
+class _ThreadMetrics:
+    __slots__ = ('requests', 'buckets', 'sums')
+
+    def __init__(self):
+        self.requests = {}  # (route, status) -> count
+        self.buckets = {}   # route -> per-bucket counts, last slot is +Inf
+        self.sums = {}      # route -> total seconds
+
+
+class Metrics:
+    """Request counts and latency histograms, kept per thread.
+
+    Each thread writes only to its own counters, so ``observe`` takes no
+    lock; ``render`` sums every thread's counters at scrape time.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_SEC):
+        self.bucket_bounds = buckets
+        self._local = threading.local()
+        self._threads = []
+        self._register_lock = threading.Lock()
+
+    def _counters(self):
+        counters = _ThreadMetrics()
+        with self._register_lock:
+            self._threads.append(counters)
+        self._local.counters = counters
+        return counters
+
+    def observe(self, route, status, seconds):
+        try:
+            counters = self._local.counters
+        except AttributeError:
+            counters = self._counters()
+        key = (route, status)
+        counters.requests[key] = counters.requests.get(key, 0) + 1
+        buckets = counters.buckets.get(route)
+        if buckets is None:
+            buckets = counters.buckets[route] = [0] * (len(self.bucket_bounds) + 1)
+            counters.sums[route] = 0.0
+        buckets[bisect_left(self.bucket_bounds, seconds)] += 1
+        counters.sums[route] += seconds
+
+    def render(self, extra_gauges=()):
+        """Return all metrics in the Prometheus text exposition format."""
+        requests, buckets, sums = {}, {}, {}
+        with self._register_lock:
+            threads = list(self._threads)
+        for counters in threads:
+            # Copies, since the owning thread may add keys while we read
+            for key, count in list(counters.requests.items()):
+                requests[key] = requests.get(key, 0) + count
+            for route, counts in list(counters.buckets.items()):
+                total = buckets.setdefault(route, [0] * len(counts))
+                for i, count in enumerate(counts):
+                    total[i] += count
+                sums[route] = sums.get(route, 0.0) + counters.sums.get(route, 0.0)
+
+        lines = [
+            '# HELP guess_requests_total Requests served, by route and status.',
+            '# TYPE guess_requests_total counter',
+        ]
+        for (route, status), count in sorted(requests.items()):
+            lines.append(f'guess_requests_total{{route="{route}",status="{status}"}} {count}')
+        lines += [
+            '# HELP guess_request_duration_seconds Time spent serving a request, by route.',
+            '# TYPE guess_request_duration_seconds histogram',
+        ]
+        for route in sorted(buckets):
+            cumulative = 0
+            for bound, count in zip(self.bucket_bounds + ('+Inf',), buckets[route]):
+                cumulative += count
+                lines.append(f'guess_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'guess_request_duration_seconds_sum{{route="{route}"}} {sums[route]:.6f}')
+            lines.append(f'guess_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+        for name, kind, help_text, value in extra_gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+class AccessLog:
+    """Structured access log written off the request path.
+
+    Request threads append a small tuple to a bounded in-memory queue and
+    return; a background writer formats the queued entries as JSON lines
+    and writes them in one batch every ``flush_interval`` seconds. When the
+    queue is full the entry is dropped and counted rather than blocking
+    the request. File logs rotate to ``path.1`` .. ``path.N`` by size; the
+    path ``-`` logs to stderr without rotation.
+    """
+
+    def __init__(self, path, capacity=ACCESS_LOG_QUEUE, flush_interval=ACCESS_LOG_FLUSH_SEC,
+                 max_bytes=ACCESS_LOG_MAX_BYTES, backups=ACCESS_LOG_BACKUPS):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.written = 0
+        self._queue = deque()
+        self._file = None if path == '-' else open(path, 'ab', opener=_private_opener)
+        self._size = self._file.tell() if self._file else 0
+        self._stopping = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name='access-log', daemon=True)
+        self._writer.start()
+
+    def log(self, method, route, status, seconds, session, client):
+        # Unlocked length check: the queue may overshoot by a few entries
+        # under contention, which is fine for a memory bound.
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            return
+        self._queue.append((time.time(), method, route, status, seconds, session, client))
+
+    def _write_loop(self):
+        while not self._stopping.wait(self.flush_interval):
+            if self._queue:
+                self.flush()
+
+    def close(self):
+        """Stop the writer and write out whatever is still queued."""
+        self._stopping.set()
+        self._writer.join()
+        if self._queue:
+            self.flush()
+        if self._file is not None:
+            self._file.close()
+
+    def flush(self):
+        lines = []
+        queue = self._queue
+        while queue:
+            ts, method, route, status, seconds, session, client = queue.popleft()
+            lines.append(json.dumps({
+                'ts': round(ts, 6), 'method': method, 'route': route, 'status': status,
+                'latency_ms': round(seconds * 1000, 3), 'session': session, 'client': client
+            }))
+        data = ('\n'.join(lines) + '\n').encode()
+        if self._file is None:
+            sys.stderr.buffer.write(data)
+            sys.stderr.flush()
+        else:
+            if self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+        self.written += len(lines)
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f'{self.path}.{index}'):
+                os.replace(f'{self.path}.{index}', f'{self.path}.{index + 1}')
+        os.replace(self.path, f'{self.path}.1')
+        self._file = open(self.path, 'ab', opener=_private_opener)
+        self._size = 0
+
+
+class RateLimiter:
+    """Per-client token buckets in bounded memory.
+
+    Each client earns ``rate`` tokens per second up to ``burst`` and spends
+    one per request. Buckets sit in lock-striped LRU shards like the
+    session store; once a shard holds its share of ``max_clients`` the
+    least recently seen client is forgotten, which only ever gives that
+    client a fresh, full bucket.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_PER_SEC, burst=RATE_LIMIT_BURST, max_clients=RATE_LIMIT_CLIENTS,
+                 shards=RATE_LIMIT_SHARDS):
+        self.rate = rate
+        self.burst = burst
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_cap = max(1, max_clients // shards)
+
+    def check(self, client):
+        """Spend a token for ``client``; return 0.0 if admitted, else seconds until it may retry."""
+        shard = self._shards[hash(client) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            bucket = shard.entries.get(client)
+            if bucket is None:
+                bucket = shard.entries[client] = [float(self.burst), now]
+                if len(shard.entries) > self._shard_cap:
+                    shard.entries.popitem(last=False)
+                    shard.evictions += 1
+            else:
+                shard.entries.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+def metrics_route(path):
+    """Collapse a request path onto a bounded set of route labels."""
+    path = path.partition('?')[0]
+    return path if path in METRIC_ROUTES else 'other'
+
+
+sessions = SessionStore()
+metrics = Metrics()
+# Created in __main__ so importing this module never touches disk
+leaderboard = None
+access_log = None
+# Admission control, set up by serve(); None disables that check
+rate_limiter = None
+inflight = None
+rejections = {'rate_limited': 0, 'overloaded': 0}
+
+
+def admit(client):
+    """Apply the rate limit and the in-flight cap before a request runs.
+
+    Returns None when the request may proceed, in which case the caller
+    must call ``release()`` once it is done, or a ready-made 429/503
+    response to send instead.
+    """
+    if rate_limiter is not None:
+        wait = rate_limiter.check(client)
+        if wait:
+            rejections['rate_limited'] += 1
+            status, headers, body = json_response({'error': 'rate_limited'}, status=429)
+            return status, headers + [('Retry-After', str(math.ceil(wait)))], body
+    if inflight is not None and not inflight.acquire(blocking=False):
+        rejections['overloaded'] += 1
+        status, headers, body = json_response({'error': 'overloaded'}, status=503)
+        return status, headers + [('Retry-After', '1')], body
+    return None
+
+
+def release():
+    if inflight is not None:
+        inflight.release()
+
+
+def record_request(method, target, status, started, headers, client):
+    """Feed one finished request into the metrics and the access log."""
+    seconds = time.perf_counter() - started
+    route = metrics_route(target)
+    metrics.observe(route, status, seconds)
+    if access_log is not None:
+        # The same tag /leaderboard shows, never the cookie itself
+        session_id = session_id_from_cookie(headers.get('cookie'))
+        access_log.log(method, route, status, seconds, player_tag(session_id) if session_id else None, client)
+
+INDEX_HTML = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -60,11 +1108,57 @@ class GuessGameHandler(http.server.SimpleHTTPRequestHandler):
                 
                 <script>
                     let attempts = 0;
+                    // Guesses go over one WebSocket when the upgrade works and
+                    // fall back to a fetch per guess when it does not.
+                    let socket = null;
+                    
+                    function openSocket() {
+                        if (!('WebSocket' in window)) {
+                            return;
+                        }
+                        const scheme = location.protocol === 'https:' ? 'wss://' : 'ws://';
+                        const ws = new WebSocket(scheme + location.host + '/ws');
+                        ws.onopen = () => { socket = ws; };
+                        ws.onmessage = event => showResult(JSON.parse(event.data));
+                        ws.onclose = () => { socket = null; };
+                    }
+                    
+                    function showResult(data) {
+                        if (!data.result) {
+                            return;
+                        }
+                        const messageDiv = document.getElementById('message');
+                        const attemptsDiv = document.getElementById('attempts');
+                        const arrowDiv = document.getElementById('arrow');
+                        const arrowLeft = document.getElementById('arrow-left');
+                        const arrowRight = document.getElementById('arrow-right');
+                        const arrowUp = document.getElementById('arrow-up');
+                        
+                        // Hide all arrows first
+                        arrowLeft.style.display = 'none';
+                        arrowRight.style.display = 'none';
+                        arrowUp.style.display = 'none';
+                        
+                        if (data.result === 'correct') {
+                            messageDiv.innerHTML = '<span class="success">Got it!</span>';
+                            attemptsDiv.innerHTML = `You guessed the number in ${attempts} attempts.`;
+                            arrowDiv.classList.add('arrow-hidden');
+                        } else if (data.result === 'too_low') {
+                            messageDiv.innerHTML = '<span class="error">Too low</span>';
+                            attemptsDiv.innerHTML = `Attempts: ${attempts}`;
+                            arrowDiv.classList.remove('arrow-hidden');
+                            arrowRight.style.display = 'inline';
+                        } else if (data.result === 'too_high') {
+                            messageDiv.innerHTML = '<span class="error">Too high</span>';
+                            attemptsDiv.innerHTML = `Attempts: ${attempts}`;
+                            arrowDiv.classList.remove('arrow-hidden');
+                            arrowLeft.style.display = 'inline';
+                        }
+                    }
                     
                     function makeGuess() {
                         const guess = parseInt(document.getElementById('guess').value);
                         const messageDiv = document.getElementById('message');
-                        const attemptsDiv = document.getElementById('attempts');
                         
                         if (isNaN(guess) || guess < 1 || guess > 100) {
                             messageDiv.innerHTML = '<span class="error">Please enter a number between 1 and 100</span>';
@@ -73,35 +1167,13 @@ class GuessGameHandler(http.server.SimpleHTTPRequestHandler):
                         
                         attempts++;
                         
+                        if (socket && socket.readyState === WebSocket.OPEN) {
+                            socket.send(String(guess));
+                            return;
+                        }
                         fetch(`/guess?number=${guess}`)
                             .then(response => response.json())
-                            .then(data => {
-                                const arrowDiv = document.getElementById('arrow');
-                                const arrowLeft = document.getElementById('arrow-left');
-                                const arrowRight = document.getElementById('arrow-right');
-                                const arrowUp = document.getElementById('arrow-up');
-                                
-                                // Hide all arrows first
-                                arrowLeft.style.display = 'none';
-                                arrowRight.style.display = 'none';
-                                arrowUp.style.display = 'none';
-                                
-                                if (data.result === 'correct') {
-                                    messageDiv.innerHTML = '<span class="success">Got it!</span>';
-                                    attemptsDiv.innerHTML = `You guessed the number in ${attempts} attempts.`;
-                                    arrowDiv.classList.add('arrow-hidden');
-                                } else if (data.result === 'too_low') {
-                                    messageDiv.innerHTML = '<span class="error">Too low</span>';
-                                    attemptsDiv.innerHTML = `Attempts: ${attempts}`;
-                                    arrowDiv.classList.remove('arrow-hidden');
-                                    arrowRight.style.display = 'inline';
-                                } else if (data.result === 'too_high') {
-                                    messageDiv.innerHTML = '<span class="error">Too high</span>';
-                                    attemptsDiv.innerHTML = `Attempts: ${attempts}`;
-                                    arrowDiv.classList.remove('arrow-hidden');
-                                    arrowLeft.style.display = 'inline';
-                                }
-                            })
+                            .then(showResult)
                             .catch(error => {
                                 messageDiv.innerHTML = '<span class="error">Error: ' + error + '</span>';
                             });
@@ -113,7 +1185,11 @@ class GuessGameHandler(http.server.SimpleHTTPRequestHandler):
                         document.getElementById('message').innerHTML = '';
                         document.getElementById('attempts').innerHTML = '';
                         document.getElementById('arrow').classList.add('arrow-hidden');
-                        fetch('/newgame');
+                        if (socket && socket.readyState === WebSocket.OPEN) {
+                            socket.send('newgame');
+                        } else {
+                            fetch('/newgame');
+                        }
                     }
                     
                     document.getElementById('guess').addEventListener('keypress', function(e) {
@@ -121,45 +1197,882 @@ class GuessGameHandler(http.server.SimpleHTTPRequestHandler):
                             makeGuess();
                         }
                     });
+                    
+                    openSocket();
                 </script>
             </body>
             </html>
             """
-            self.wfile.write(html.encode())
-            
-        elif self.path.startswith('/guess'):
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            query = urlparse(self.path).query
-            params = parse_qs(query)
-            guess = int(params.get('number', [0])[0])
-            
-            if guess < game_state['target_number']:
-                result = 'too_low'
-            elif guess > game_state['target_number']:
-                result = 'too_high'
+
+
+def _build_index_responses(html):
+    """Encode, compress and tag the index page once.
+
+    Returns ``{gzipped: (etag, ok_response, not_modified_response)}``. The
+    gzip variant gets its own strong ETag since its bytes differ from the
+    identity body.
+    """
+    body = html.encode()
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    responses = {}
+    for gzipped, etag, payload in ((False, f'"{digest}"', body), (True, f'"{digest}-gz"', compressed)):
+        headers = [('ETag', etag), ('Cache-Control', INDEX_CACHE_CONTROL), ('Vary', 'Accept-Encoding')]
+        ok_headers = [('Content-type', 'text/html; charset=utf-8')] + headers
+        if gzipped:
+            ok_headers.append(('Content-Encoding', 'gzip'))
+        responses[gzipped] = (etag, (200, ok_headers, payload), (304, headers, b''))
+    return responses
+
+
+INDEX_RESPONSES = _build_index_responses(INDEX_HTML)
+
+
+def _qvalue(params):
+    """Quality from an Accept-Encoding entry's parameters; malformed counts as 0."""
+    for param in params.split(';'):
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                q = float(value.strip())
+            except ValueError:
+                return 0.0
+            return q if 0.0 <= q <= 1.0 else 0.0
+    return 1.0
+
+
+def accepts_gzip(accept_encoding):
+    """Whether gzip is acceptable; an explicit gzip entry overrides ``*``."""
+    if not accept_encoding:
+        return False
+    wildcard = None
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if coding == 'gzip':
+            return _qvalue(params) > 0
+        if coding == '*' and wildcard is None:
+            wildcard = _qvalue(params) > 0
+    return bool(wildcard)
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def index_response(headers):
+    etag, ok, not_modified = INDEX_RESPONSES[accepts_gzip(headers.get('accept-encoding'))]
+    if etag_matches(headers.get('if-none-match'), etag):
+        return not_modified
+    return ok
+
+
+def resolve_session(headers):
+    """Return ``(session_id, entry, is_new)`` for the client sending ``headers``."""
+    session_id = session_id_from_cookie(headers.get('cookie'))
+    entry = sessions.get(session_id) if session_id else None
+    if entry is None:
+        session_id, entry = sessions.create()
+        return session_id, entry, True
+    return session_id, entry, False
+
+
+def json_response(payload, session_id=None, status=200):
+    headers = [('Content-type', 'application/json')]
+    if session_id:
+        headers.append(('Set-Cookie', f'{SESSION_COOKIE}={session_id}; Path=/; HttpOnly; SameSite=Lax'))
+    return status, headers, json.dumps(payload).encode()
+
+
+def compare_guess(target, guess):
+    if guess < target:
+        return 'too_low'
+    elif guess > target:
+        return 'too_high'
+    return 'correct'
+
+
+def player_tag(session_id):
+    """Public leaderboard name for a session: stable, but useless as a cookie."""
+    return hmac.new(PLAYER_TAG_KEY, session_id.encode(), hashlib.sha256).hexdigest()[:8]
+
+
+def apply_guess(session_id, state, guess):
+    """Score ``guess`` against the session's game and record a win."""
+    result = compare_guess(state['target_number'], guess)
+    if not state['won']:
+        state['attempts'] += 1
+        if result == 'correct':
+            state['won'] = True
+            if leaderboard is not None:
+                leaderboard.record(player_tag(session_id), state['attempts'])
+    return result
+
+
+def parse_batch(content_type, body):
+    """Decode a batch of guesses.
+
+    ``application/octet-stream`` bodies are packed big-endian unsigned
+    32-bit integers; anything else is read as JSON, either a bare list or
+    ``{"guesses": [...]}``. Raises ValueError on malformed input.
+    """
+    if content_type.split(';')[0].strip().lower() == 'application/octet-stream':
+        if len(body) % 4:
+            raise ValueError('binary batch length must be a multiple of 4')
+        return [value for (value,) in struct.iter_unpack('!I', body)]
+    payload = json.loads(body)
+    guesses = payload.get('guesses') if isinstance(payload, dict) else payload
+    if not isinstance(guesses, list) or not all(type(g) is int for g in guesses):
+        raise ValueError('expected a list of integer guesses')
+    return guesses
+
+
+def query_int(query, name):
+    """Return the integer value of ``name`` in a raw query string.
+
+    A hand-rolled scan instead of urlparse + parse_qs: the hot parameters
+    are plain ASCII integers, so unquoting only happens when a value
+    actually contains an escape. Returns None when the parameter is missing
+    and raises ValueError when it is not an integer.
+    """
+    for pair in query.split('&'):
+        key, _, value = pair.partition('=')
+        if key == name:
+            if '%' in value or '+' in value:
+                value = unquote_plus(value)
+            digits = value[1:] if value[:1] == '-' else value
+            if not (digits.isascii() and digits.isdigit()):
+                raise ValueError(f'{name} must be an integer')
+            return int(value)
+    return None
+
+
+def bad_request(message):
+    return json_response({'error': message}, status=400)
+
+
+def reset_game(state):
+    state['target_number'] = random.randint(1, 100)
+    state['attempts'] = 0
+    state['won'] = False
+
+
+def route_index(headers, query, body):
+    return index_response(headers)
+
+
+def route_guess(headers, query, body):
+    try:
+        guess = query_int(query, 'number')
+    except ValueError as exc:
+        return bad_request(str(exc))
+    if guess is None:
+        return bad_request('number is required')
+    session_id, state, is_new = resolve_session(headers)
+    result = apply_guess(session_id, state, guess)
+    sessions.save(session_id, state)
+    return json_response({'result': result}, session_id if is_new else None)
+
+
+def route_batch(headers, query, body):
+    started = time.perf_counter_ns()
+    try:
+        guesses = parse_batch(headers.get('content-type') or '', body)
+    except ValueError as exc:
+        return bad_request(str(exc))
+    if len(guesses) > MAX_BATCH_GUESSES:
+        return json_response({'error': f'at most {MAX_BATCH_GUESSES} guesses per batch'}, status=413)
+
+    session_id, state, is_new = resolve_session(headers)
+    results = []
+    for guess in guesses:
+        result = apply_guess(session_id, state, guess)
+        results.append(result)
+        if result == 'correct':
+            break
+    sessions.save(session_id, state)
+
+    server_time_us = (time.perf_counter_ns() - started) // 1000
+    return json_response({'results': results, 'server_time_us': server_time_us},
+                         session_id if is_new else None)
+
+
+def route_newgame(headers, query, body):
+    session_id, state, is_new = resolve_session(headers)
+    reset_game(state)
+    sessions.save(session_id, state)
+    return json_response({'status': 'new_game_started'}, session_id if is_new else None)
+
+
+def route_leaderboard(headers, query, body):
+    try:
+        top = query_int(query, 'top')
+    except ValueError as exc:
+        return bad_request(str(exc))
+    top = min(max(top if top is not None else 10, 1), LEADERBOARD_CAPACITY)
+    return json_response({'leaderboard': leaderboard.top(top) if leaderboard is not None else []})
+
+
+def route_metrics(headers, query, body):
+    extra = [
+        ('guess_live_sessions', 'gauge', 'Sessions currently held in memory.', len(sessions)),
+        ('guess_session_evictions_total', 'counter', 'Sessions dropped by TTL or LRU eviction.', sessions.evictions),
+    ]
+    extra += [
+        ('guess_rate_limited_total', 'counter', 'Requests refused with 429 by the per-client rate limit.',
+         rejections['rate_limited']),
+        ('guess_overloaded_total', 'counter', 'Requests or connections shed with 503 under overload.',
+         rejections['overloaded']),
+    ]
+    if access_log is not None:
+        extra.append(('guess_access_log_dropped_total', 'counter', 'Access log lines dropped on a full queue.',
+                      access_log.dropped))
+    return 200, [('Content-type', 'text/plain; version=0.0.4')], metrics.render(extra).encode()
+
+
+def route_stats(headers, query, body):
+    stats = sessions.stats()
+    if leaderboard is not None:
+        stats['leaderboard'] = leaderboard.stats()
+    return json_response(stats)
+
+
+# Exact paths, looked up in one dict probe
+ROUTES = {
+    ('GET', '/'): route_index,
+    ('GET', '/guess'): route_guess,
+    ('GET', '/newgame'): route_newgame,
+    ('GET', '/leaderboard'): route_leaderboard,
+    ('GET', '/metrics'): route_metrics,
+    ('GET', '/stats'): route_stats,
+    ('POST', '/guess/batch'): route_batch,
+}
+
+
+def content_length(value):
+    """Parse a Content-Length header; raises ValueError unless it is a plain non-negative integer."""
+    value = (value or '0').strip()
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError('invalid Content-Length')
+    return int(value)
+
+
+def handle_request(method, target, headers, body=b''):
+    """Run one request through the game routes.
+
+    ``headers`` only needs a ``get`` that accepts lower-case names, so both
+    ``http.server`` header objects and plain dicts work. Returns
+    ``(status, headers, body)``, or None when ``target`` is not a game
+    route. Bad input gets a 400 before anything is written to the client.
+    """
+    path, _, query = target.partition('?')
+    handler = ROUTES.get((method, path))
+    if handler is None:
+        return None
+    return handler(headers, query, body)
+
+
+class GuessGameHandler(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between guesses; every response
+    # therefore carries a Content-Length.
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT_SEC
+    # Set once the socket has been handed to the WebSocket hub
+    detached = False
+    # Small responses on a kept-alive connection otherwise stall on
+    # Nagle's algorithm waiting for the client's delayed ACK. The buffered
+    # wfile is flushed once per request by handle_one_request, so headers
+    # and body leave together.
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    status = None
+
+    def log_request(self, code='-', size='-'):
+        # Requests are recorded through record_request; errors still go to stderr
+        pass
+
+    def send_response_only(self, code, message=None):
+        self.status = code
+        super().send_response_only(code, message)
+
+    def send_result(self, result):
+        status, headers, body = result
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.serve_admitted('GET', self.serve_get)
+
+    def do_POST(self):
+        self.serve_admitted('POST', self.serve_post)
+
+    def serve_admitted(self, method, serve_method):
+        started = time.perf_counter()
+        # One handler serves every request on a kept-alive connection
+        self.status = None
+        client = self.client_address[0]
+        rejected = admit(client)
+        if rejected is not None:
+            self.send_result(rejected)
+        else:
+            try:
+                serve_method()
+            except Exception:
+                self.log_error('error serving %s %s', method, self.path)
+                traceback.print_exc()
+                if self.status is None:
+                    self.send_result(json_response({'error': 'internal_error'}, status=500))
+                self.close_connection = True
+            finally:
+                release()
+        record_request(method, self.path, self.status, started, self.headers, client)
+
+    def serve_get(self):
+        if self.path == WS_PATH and is_websocket_upgrade(self.headers):
+            self.upgrade_to_websocket()
+            return
+        result = handle_request('GET', self.path, self.headers)
+        if result is None:
+            # Only the game routes are served; nothing on disk is reachable
+            result = json_response({'error': 'not_found'}, status=404)
+        self.send_result(result)
+
+    def upgrade_to_websocket(self):
+        """Complete the handshake and hand the socket to the WebSocket hub.
+
+        The worker thread is released straight away; the connection lives on
+        as a coroutine on the hub's event loop.
+        """
+        response, session_id = websocket_accept(self.headers)
+        self.status = 101
+        self.wfile.write(response)
+        self.wfile.flush()
+        self.close_connection = True
+        self.detached = True
+        websocket_hub().adopt(self.connection, session_id, self.client_address[0])
+
+    def serve_post(self):
+        try:
+            length = content_length(self.headers.get('Content-Length'))
+        except ValueError:
+            self.send_error(400, 'Bad Content-Length')
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_error(413)
+            return
+        body = self.rfile.read(length) if length else b''
+        result = handle_request('POST', self.path, self.headers, body)
+        if result is None:
+            self.send_error(404)
+        else:
+            self.send_result(result)
+
+
+class ThreadPoolHTTPServer(socketserver.TCPServer):
+    """TCP server that hands each connection to a bounded pool of workers.
+
+    At most ``threads`` connections are served at once and at most
+    ``threads`` more wait for a worker; past that new connections get an
+    immediate 503 and are closed, so overload drains the listen backlog
+    instead of letting it grow.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, server_address, handler_class, threads=DEFAULT_THREADS, reuse_port=False):
+        self.reuse_port = reuse_port
+        # Created first: a failed bind calls server_close before __init__ returns
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='guess-worker')
+        self._slots = threading.BoundedSemaphore(threads * 2)
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            rejections['overloaded'] += 1
+            try:
+                request.sendall(OVERLOADED_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _process(self, request, client_address):
+        handler = None
+        try:
+            handler = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            # Upgraded WebSocket connections now belong to the hub
+            if handler is None or not handler.detached:
+                self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+# ------------------------------ WebSockets ------------------------------
+
+def is_websocket_upgrade(headers):
+    return ('websocket' in (headers.get('upgrade') or '').lower()
+            and 'upgrade' in (headers.get('connection') or '').lower()
+            and headers.get('sec-websocket-version') == '13'
+            and bool(headers.get('sec-websocket-key')))
+
+
+def websocket_accept(headers):
+    """Return ``(101 response bytes, session_id)`` for a validated upgrade."""
+    session_id, _, is_new = resolve_session(headers)
+    key = headers.get('sec-websocket-key').strip()
+    accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+    lines = [
+        'HTTP/1.1 101 Switching Protocols',
+        'Upgrade: websocket',
+        'Connection: Upgrade',
+        f'Sec-WebSocket-Accept: {accept}',
+    ]
+    if is_new:
+        lines.append(f'Set-Cookie: {SESSION_COOKIE}={session_id}; Path=/; HttpOnly; SameSite=Lax')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'), session_id
+
+
+def encode_frame(opcode, payload):
+    """Build an unmasked, unfragmented server frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_frame(reader):
+    """Read one client frame and return ``(opcode, payload)``.
+
+    Raises ValueError for frames this server does not accept: unmasked,
+    fragmented or larger than WS_MAX_FRAME_BYTES.
+    """
+    first, second = await asyncio.wait_for(reader.readexactly(2), WS_IDLE_TIMEOUT_SEC)
+    if not first & 0x80 or not second & 0x80:
+        raise ValueError('fragmented or unmasked frame')
+    length = second & 0x7f
+    if length == 126:
+        (length,) = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack('!Q', await reader.readexactly(8))
+    if length > WS_MAX_FRAME_BYTES:
+        raise ValueError('frame too large')
+    mask = await reader.readexactly(4)
+    payload = await reader.readexactly(length)
+    key = int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+    return first & 0x0f, (int.from_bytes(payload, 'big') ^ key).to_bytes(length, 'big')
+
+
+def websocket_message(session_id, text):
+    """Answer one text frame: a guess like ``"42"`` or ``"newgame"``."""
+    state = sessions.get(session_id)
+    if state is None:
+        return None
+    if text == 'newgame':
+        reset_game(state)
+        sessions.save(session_id, state)
+        return {'status': 'new_game_started'}
+    try:
+        guess = int(text)
+    except ValueError:
+        return {'error': 'expected a number or "newgame"'}
+    result = apply_guess(session_id, state, guess)
+    sessions.save(session_id, state)
+    return {'result': result}
+
+
+async def websocket_session(reader, writer, session_id, client):
+    """Serve guesses over an upgraded connection until either side closes.
+
+    Each guess spends a token from the client's rate limit like an HTTP
+    request would.
+    """
+    close_code = 1000
+    try:
+        while True:
+            try:
+                opcode, payload = await read_frame(reader)
+            except ValueError:
+                close_code = 1002
+                break
+            if opcode == 0x8:  # close
+                break
+            elif opcode == 0x9:  # ping
+                writer.write(encode_frame(0xA, payload))
+            elif opcode == 0x1:  # text
+                started = time.perf_counter()
+                wait = rate_limiter.check(client) if rate_limiter is not None else 0.0
+                if wait:
+                    rejections['rate_limited'] += 1
+                    writer.write(encode_frame(0x1, json.dumps({'error': 'rate_limited', 'retry_after': wait}).encode()))
+                    metrics.observe(WS_PATH, 429, time.perf_counter() - started)
+                    await writer.drain()
+                    continue
+                reply = websocket_message(session_id, payload.decode('utf-8', 'replace').strip())
+                if reply is None:
+                    # Session expired; the page falls back to fetch and gets a new cookie
+                    close_code = 1008
+                    break
+                writer.write(encode_frame(0x1, json.dumps(reply).encode()))
+                metrics.observe(WS_PATH, 200, time.perf_counter() - started)
+            await writer.drain()
+        writer.write(encode_frame(0x8, struct.pack('!H', close_code)))
+        await writer.drain()
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+class WebSocketHub:
+    """Event loop on a background thread that owns upgraded connections.
+
+    Threaded mode hands sockets over here after the handshake, so idle
+    WebSocket players cost a coroutine each rather than a worker thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name='websocket-hub', daemon=True).start()
+
+    def adopt(self, sock, session_id, client):
+        asyncio.run_coroutine_threadsafe(self._serve(sock, session_id, client), self.loop)
+
+    async def _serve(self, sock, session_id, client):
+        reader, writer = await asyncio.open_connection(sock=sock)
+        await websocket_session(reader, writer, session_id, client)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def websocket_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = WebSocketHub()
+        return _hub
+
+
+# ------------------------------ asyncio mode ------------------------------
+
+def format_response(status, headers, body, keep_alive):
+    reason = http.server.BaseHTTPRequestHandler.responses.get(status, ('',))[0]
+    lines = [f'HTTP/1.1 {status} {reason}']
+    lines.extend(f'{name}: {value}' for name, value in headers)
+    if status != 304:
+        lines.append(f'Content-Length: {len(body)}')
+    lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+async def read_request(reader):
+    """Read one request from ``reader``; returns None at a clean end of stream.
+
+    The whole request, headers and body included, has to arrive within
+    KEEPALIVE_TIMEOUT_SEC, so a client trickling bytes cannot hold the
+    connection open indefinitely.
+    """
+    return await asyncio.wait_for(_read_request(reader), KEEPALIVE_TIMEOUT_SEC)
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, version = request_line.decode('latin-1').split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = content_length(headers.get('content-length'))
+    if length > MAX_BODY_BYTES:
+        raise ValueError('request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+open_connections = 0
+
+
+async def serve_connection(reader, writer):
+    """Serve keep-alive requests on one connection until it closes or idles out."""
+    global open_connections
+    client = (writer.get_extra_info('peername') or ('-',))[0]
+    if open_connections >= MAX_CONNECTIONS:
+        rejections['overloaded'] += 1
+        writer.write(OVERLOADED_RESPONSE)
+        writer.close()
+        return
+    open_connections += 1
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except ValueError:
+                writer.write(format_response(400, [], b'', keep_alive=False))
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            started = time.perf_counter()
+            result = admit(client)
+            if result is None and target == WS_PATH and is_websocket_upgrade(headers):
+                release()
+                response, session_id = websocket_accept(headers)
+                writer.write(response)
+                record_request(method, target, 101, started, headers, client)
+                await websocket_session(reader, writer, session_id, client)
+                return
+            connection = headers.get('connection', '').lower()
+            if version == 'HTTP/1.1':
+                keep_alive = connection != 'close'
             else:
-                result = 'correct'
-            
-            response = {'result': result}
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif self.path == '/newgame':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            game_state['target_number'] = random.randint(1, 100)
-            game_state['attempts'] = 0
-            response = {'status': 'new_game_started'}
-            self.wfile.write(json.dumps(response).encode())
+                keep_alive = connection == 'keep-alive'
+
+            if result is None:
+                try:
+                    result = handle_request(method, target, headers, body)
+                except Exception:
+                    traceback.print_exc()
+                    writer.write(format_response(500, [], b'', keep_alive=False))
+                    record_request(method, target, 500, started, headers, client)
+                    break
+                finally:
+                    release()
+            if result is None:
+                result = json_response({'error': 'not_found'}, status=404)
+            writer.write(format_response(*result, keep_alive=keep_alive))
+            await writer.drain()
+            record_request(method, target, result[0], started, headers, client)
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        open_connections -= 1
+        writer.close()
+
+
+async def serve_asyncio(port, reuse_port=False):
+    server = await asyncio.start_server(serve_connection, '', port, backlog=LISTEN_BACKLOG,
+                                        reuse_address=True, reuse_port=reuse_port or None)
+    async with server:
+        await server.serve_forever()
+
+
+def start_snapshots(args):
+    """Resume sessions from the last snapshot and keep taking new ones."""
+    if args.snapshot == 'off':
+        return None
+    started = time.perf_counter()
+    snapshotter = SessionSnapshotter(args.snapshot, args.snapshot_interval)
+    snapshot = snapshotter.attach(sessions)
+    if snapshot is not None:
+        print(f"Resuming {snapshot.sessions} sessions from {args.snapshot} "
+              f"(mapped in {(time.perf_counter() - started) * 1000:.1f} ms)")
+    snapshotter.start()
+    return snapshotter
+
+
+def serve(args, reuse_port=False, worker=None):
+    """Run one server process. Pre-forked workers leave snapshots to the housekeeper."""
+    global access_log, rate_limiter, inflight
+    if args.rate > 0:
+        rate_limiter = RateLimiter(args.rate, max(1, args.burst))
+    if args.max_inflight > 0:
+        inflight = threading.BoundedSemaphore(args.max_inflight)
+    if args.access_log != 'off':
+        path = args.access_log
+        if worker is not None and path != '-':
+            path = f'{path}.worker{worker}'
+        access_log = AccessLog(path)
+    snapshotter = None
+    if worker is None:
+        snapshotter = start_snapshots(args)
+        # Treat SIGTERM like Ctrl+C so the final snapshot still gets written,
+        # even when SIGINT is ignored (background jobs, nohup)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        if args.mode == 'asyncio':
+            asyncio.run(serve_asyncio(args.port, reuse_port))
         else:
-            super().do_GET()
+            with ThreadPoolHTTPServer(("", args.port), GuessGameHandler, threads=args.threads,
+                                      reuse_port=reuse_port) as httpd:
+                httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if snapshotter is not None:
+            snapshotter.snapshot()
+        if access_log is not None:
+            access_log.close()
+
+
+# ------------------------------ pre-fork mode ------------------------------
+
+# spawn() index of the housekeeper; workers are numbered from 0
+HOUSEKEEPER = -1
+
+
+def housekeep(args, shared_board, snapshotter):
+    """Pre-fork housekeeper: owns the leaderboard log, takes session
+    snapshots and sweeps expired sessions until told to stop."""
+    global leaderboard
+    leaderboard = Leaderboard(args.leaderboard)
+    threading.Thread(target=shared_board.pump, args=(leaderboard,), name='leaderboard-pump', daemon=True).start()
+    if snapshotter is not None:
+        snapshotter.start()
+    try:
+        while True:
+            time.sleep(SESSION_SWEEP_INTERVAL_SEC)
+            sessions.sweep()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if snapshotter is not None:
+            snapshotter.snapshot()
+
+
+def run_workers(args):
+    """Fork ``args.workers`` servers sharing the port via SO_REUSEPORT.
+
+    Sessions live in a SharedSessionTable so a player's requests can land
+    on any worker; wins go through a SharedLeaderboard to the one
+    Leaderboard a housekeeper process owns, which also takes snapshots.
+    The supervisor itself never starts a thread, so crashed children are
+    restarted with a plain fork, after releasing any lock they died holding.
+    """
+    global sessions
+    sessions = SharedSessionTable()
+    shared_board = SharedLeaderboard()
+    snapshotter = None
+    children = {}
+
+    def spawn(index):
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            global leaderboard
+            # Children unwind on SIGTERM too, so workers flush their access logs
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            code = 0
+            try:
+                if index == HOUSEKEEPER:
+                    housekeep(args, shared_board, snapshotter)
+                else:
+                    leaderboard = shared_board
+                    serve(args, reuse_port=True, worker=index)
+            except BaseException:
+                code = 1
+            os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # The housekeeper writes the final snapshot on its way out
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        raise SystemExit(0)
+
+    if args.snapshot != 'off':
+        # Map the snapshot before forking so every child inherits it
+        snapshotter = SessionSnapshotter(args.snapshot, args.snapshot_interval)
+        snapshot = snapshotter.attach(sessions)
+        if snapshot is not None:
+            print(f"Resuming {snapshot.sessions} sessions from {args.snapshot}")
+    spawn(HOUSEKEEPER)
+    for index in range(args.workers):
+        spawn(index)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while True:
+        pid, status = os.wait()
+        index = children.pop(pid, None)
+        if index is None:
+            continue
+        sessions.release_locks(pid)
+        shared_board.release_locks(pid)
+        name = 'Housekeeper' if index == HOUSEKEEPER else f'Worker {index}'
+        print(f"{name} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+        time.sleep(0.1)
+        spawn(index)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Guess the Number Game server')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--mode', choices=('threaded', 'asyncio'), default='threaded',
+                        help='threaded: bounded worker pool; asyncio: single event loop')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='worker pool size in threaded mode')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='fork this many server processes sharing the port (0: single process)')
+    parser.add_argument('--leaderboard', default=LEADERBOARD_PATH,
+                        help='append-only log of completed games')
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, metavar='PATH',
+                        help="session snapshot file used to resume games after a restart, or 'off'")
+    parser.add_argument('--snapshot-interval', type=float, default=SNAPSHOT_INTERVAL_SEC,
+                        help='seconds between session snapshots')
+    parser.add_argument('--access-log', default='-', metavar='PATH',
+                        help="JSON-lines access log: a file path (rotated by size), '-' for stderr, or 'off'")
+    parser.add_argument('--rate', type=float, default=RATE_LIMIT_PER_SEC,
+                        help='requests per second allowed per client IP, per process (0: no limit)')
+    parser.add_argument('--burst', type=int, default=RATE_LIMIT_BURST,
+                        help='requests a client may send back to back before --rate applies')
+    parser.add_argument('--max-inflight', type=int, default=MAX_INFLIGHT,
+                        help='requests handled at once per process before answering 503 (0: no cap)')
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    PORT = 8000
-    with socketserver.TCPServer(("", PORT), GuessGameHandler) as httpd:
-        print(f"Guess the Number Game server running at http://localhost:{PORT}")
-        print("Press Ctrl+C to stop the server")
-        httpd.serve_forever()
\ No newline at end of file
+    args = parse_args()
+    print(f"Guess the Number Game server running at http://localhost:{args.port} ({args.mode} mode)")
+    print("Press Ctrl+C to stop the server")
+    if args.workers > 0:
+        run_workers(args)
+    else:
+        leaderboard = Leaderboard(args.leaderboard)
+        serve(args)